@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+bench_bulk_load - Scaling of bulk zone hydration across processes
+
+Loads every zone of a fake PowerDNS API with
+:class:`powerdns.bulk.BulkLoader`, first parsing in the requesting threads
+(0 processes), then with 1 to N worker processes, and reports throughput
+and speedup over the threaded baseline. The fake API runs in its own
+process so it does not compete with the measured client for the GIL.
+
+Usage::
+
+    python benchmarks/bench_bulk_load.py --zones 200 --records 2000
+    python benchmarks/bench_bulk_load.py --max-processes 8 --save scaling.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+from fake_pdns import FakePDNS  # noqa: E402
+from powerdns import PDNSApiClient, PDNSEndpoint  # noqa: E402
+from powerdns.bulk import BulkLoader  # noqa: E402
+
+
+def serve(zones, records, urls, stop):
+    """Serve a fake API until *stop* is set, its url is put in *urls*"""
+    with FakePDNS(zones=zones, records=records) as fake:
+        urls.put(fake.url)
+        stop.wait()
+
+
+def measure(url, processes, args):
+    """Load every zone once per run, return the best time"""
+    timings = []
+    with BulkLoader(processes, args.threads).start() as loader:
+        for _ in range(args.runs):
+            with PDNSApiClient(url, "changeme", pool_maxsize=args.threads) as api_client:
+                zones = PDNSEndpoint(api_client).get_server("localhost").zones
+                start = time.perf_counter()
+                results = loader.load(zones)
+                timings.append(time.perf_counter() - start)
+            failed = [result for result in results if not result.ok]
+            if failed:
+                raise failed[0].error
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--zones", type=int, default=100, help="zones to load")
+    parser.add_argument("--records", type=int, default=2000,
+                        help="A records per zone")
+    parser.add_argument("--max-processes", type=int, default=os.cpu_count() or 1,
+                        help="largest number of worker processes measured")
+    parser.add_argument("--threads", type=int, default=8,
+                        help="concurrent requests")
+    parser.add_argument("--runs", type=int, default=3,
+                        help="loads per measure, the best is kept")
+    parser.add_argument("--save", metavar="FILE", help="save results as JSON")
+    args = parser.parse_args()
+
+    urls = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    server = multiprocessing.Process(target=serve, args=(args.zones, args.records,
+                                                         urls, stop), daemon=True)
+    server.start()
+    url = urls.get(timeout=60)
+    if (os.cpu_count() or 1) < 2:
+        print("warning: a single CPU is available, worker processes can't "
+              "speed up loading, measure scaling on a multi-core machine")
+
+    results = []
+    try:
+        baseline = None
+        print("%9s %10s %10s %12s %8s" % ("processes", "seconds", "zones/s",
+                                           "rrsets/s", "speedup"))
+        for processes in range(0, args.max_processes + 1):
+            seconds = measure(url, processes, args)
+            baseline = baseline or seconds
+            result = {
+                "processes": processes,
+                "seconds": seconds,
+                "zones_per_second": args.zones / seconds,
+                "rrsets_per_second": args.zones * (args.records + 2) / seconds,
+                "speedup": baseline / seconds,
+            }
+            results.append(result)
+            print("%9d %10.3f %10.1f %12.0f %7.2fx" % (
+                processes, seconds, result["zones_per_second"],
+                result["rrsets_per_second"], result["speedup"]))
+    finally:
+        stop.set()
+        server.join(5)
+
+    if args.save:
+        with open(args.save, "w") as output:
+            json.dump({"zones": args.zones, "records": args.records,
+                       "cpus": os.cpu_count(), "results": results},
+                      output, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+bench_client - Requests/sec with and without connection pooling
+
+Starts a local HTTP/1.1 stand-in server answering every request with a
+small JSON document, then compares one-shot :func:`requests.request` calls
+(previous client behaviour) with the pooled :class:`PDNSApiClient` session.
+
+Usage::
+
+    python benchmarks/bench_client.py --requests 2000
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+from powerdns.client import PDNSApiClient  # noqa: E402
+
+BODY = json.dumps([{"id": "localhost", "version": "4.1.0",
+                    "daemon_type": "authoritative"}]).encode()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answer any request with a static JSON body, keeping connections"""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    do_GET = do_PATCH = do_POST = do_PUT = do_DELETE = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def bench_unpooled(url, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        requests.request("GET", url, data="{}",
+                         headers={"Content-Type": "application/json"}).json()
+    return count / (time.perf_counter() - start)
+
+
+def bench_pooled(url, count):
+    with PDNSApiClient(url, "changeme") as api_client:
+        start = time.perf_counter()
+        for _ in range(count):
+            api_client.get("/servers")
+        return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--requests", type=int, default=1000,
+                        help="number of requests per run")
+    args = parser.parse_args()
+
+    server = start_server()
+    url = "http://%s:%d" % server.server_address
+    try:
+        before = bench_unpooled(url + "/servers", args.requests)
+        after = bench_pooled(url, args.requests)
+    finally:
+        server.shutdown()
+
+    print("requests.request (no pool): %8.1f req/s" % before)
+    print("PDNSApiClient (pooled):     %8.1f req/s" % after)
+    print("speedup:                    %8.2fx" % (after / before))
+
+
+if __name__ == "__main__":
+    main()
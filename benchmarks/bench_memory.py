@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+bench_memory - Memory used per record by parsed rrsets
+
+Parses a generated zone API response with :meth:`RRSet.parse` and with the
+previous dict based layout, then drops the response and reports the traced
+bytes still held per record.
+
+Usage::
+
+    python benchmarks/bench_memory.py --rrsets 100000 --records 2
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+from powerdns.models.rrset import RRSet  # noqa: E402
+
+
+class LegacyRRSet(object):
+    """Previous rrset layout: details dict, record dicts and a list"""
+
+    def __init__(self, zone=None, name=None, rtype=None, records=None,
+                 ttl=3600, changetype='REPLACE'):
+        self._parent = zone
+        self._details = {
+            "name": name,
+            "rtype": rtype,
+            "records": records,
+            "ttl": ttl,
+            "changetype": changetype
+        }
+        self._deleted_records = []
+
+    @classmethod
+    def parse(cls, zone, raw_data):
+        return cls(zone, name=raw_data["name"], rtype=raw_data["type"],
+                   records=raw_data["records"], ttl=raw_data["ttl"])
+
+
+def build_response(rrsets, records):
+    data = [{"name": "host%d.example.org." % i, "type": "A", "ttl": 3600,
+             "records": [{"content": "10.%d.%d.%d" % (j, i >> 8 & 255,
+                                                      i & 255),
+                          "disabled": False} for j in range(records)]}
+            for i in range(rrsets)]
+    return json.dumps(data)
+
+
+def measure(cls, text):
+    gc.collect()
+    tracemalloc.start()
+    response = json.loads(text)
+    rrsets = [cls.parse(None, data) for data in response]
+    del response
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del rrsets
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--rrsets", type=int, default=100000,
+                        help="number of rrsets")
+    parser.add_argument("--records", type=int, default=2,
+                        help="number of records per rrset")
+    args = parser.parse_args()
+
+    total = args.rrsets * args.records
+    text = build_response(args.rrsets, args.records)
+    results = [(label, measure(cls, text))
+               for label, cls in (("dict layout", LegacyRRSet),
+                                  ("slots layout", RRSet))]
+
+    for label, size in results:
+        print("%-14s %10.1f bytes/record" % (label, size / float(total)))
+    print("reduction      %10.2fx" % (results[0][1] / float(results[1][1])))
+
+
+if __name__ == "__main__":
+    main()
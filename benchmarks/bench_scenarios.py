@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+bench_scenarios - End-to-end scenarios against a fake PowerDNS API
+
+Drives PDNSEndpoint, PDNSServer, PDNSZone and RRSet against the in-process
+fake API of :mod:`fake_pdns` and reports throughput, latency percentiles
+and peak traced memory of each scenario:
+
+* cold_start: endpoint creation and full load of every zone
+* single_edit: change one record of a loaded zone and save it
+* full_sync: stage a desired state over a whole zone and send the diff
+* inventory: list a large number of zones and read their serial
+
+Results can be saved with ``--save`` and compared with a previous run
+with ``--compare``, the exit status is 1 when a scenario got slower than
+``--threshold``.
+
+Usage::
+
+    python benchmarks/bench_scenarios.py --zones 200 --records 200
+    python benchmarks/bench_scenarios.py --save before.json
+    python benchmarks/bench_scenarios.py --compare before.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+from fake_pdns import FakePDNS  # noqa: E402
+from powerdns import PDNSApiClient, PDNSEndpoint, RRSet  # noqa: E402
+
+
+def percentile(values, q):
+    """Get a percentile of measures, by nearest rank"""
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def scenario_cold_start(fake, args):
+    """Create an endpoint and load every zone, once"""
+    start = time.perf_counter()
+    with PDNSApiClient(fake.url, "changeme") as api_client:
+        server = PDNSEndpoint(api_client).get_server("localhost")
+        zones = server.prefetch()
+    return [time.perf_counter() - start], len(zones)
+
+
+def scenario_single_edit(fake, args):
+    """Edit and save one record of a loaded zone, repeatedly"""
+    timings = []
+    with PDNSApiClient(fake.url, "changeme") as api_client:
+        zone = PDNSEndpoint(api_client).get_server("localhost").zones[0]
+        zone.prefetch()
+        name = "host1.%s" % zone.get("name")
+        for index in range(args.edits):
+            start = time.perf_counter()
+            rrset = zone.get_rrset(name, "A")
+            rrset.set("records", [{"content": "192.0.2.%d" % (index % 250 + 1),
+                                   "disabled": False}])
+            zone.save()
+            timings.append(time.perf_counter() - start)
+    return timings, args.edits
+
+
+def scenario_full_sync(fake, args):
+    """Stage a desired state differing by 10% and send the changes"""
+    timings = []
+    changes = 0
+    with PDNSApiClient(fake.url, "changeme") as api_client:
+        server = PDNSEndpoint(api_client).get_server("localhost")
+        for run, zone in enumerate(server.zones[:args.syncs]):
+            start = time.perf_counter()
+            zone.prefetch()
+            desired = []
+            for index, rrset in enumerate(zone.get("rrsets")):
+                records = rrset.get_records()
+                if rrset.get("rtype") == "A" and index % 10 == run % 10:
+                    records = [{"content": "198.51.100.%d" % (index % 250 + 1),
+                                "disabled": False}]
+                desired.append(RRSet(name=rrset.get("name"), rtype=rrset.get("rtype"),
+                                     records=records, ttl=rrset.get("ttl")))
+            plan = zone.full_rrset_update(desired)
+            zone.save()
+            changes += len(plan)
+            timings.append(time.perf_counter() - start)
+    return timings, changes
+
+
+def scenario_inventory(fake, args):
+    """List every zone of a large server and read their serial"""
+    timings = []
+    with PDNSApiClient(fake.url, "changeme") as api_client:
+        for _ in range(args.inventories):
+            start = time.perf_counter()
+            server = PDNSEndpoint(api_client).get_server("localhost")
+            serials = [zone.get("serial") for zone in server.zones]
+            timings.append(time.perf_counter() - start)
+    return timings, len(serials)
+
+
+SCENARIOS = [
+    ("cold_start", scenario_cold_start, "zones"),
+    ("single_edit", scenario_single_edit, "records"),
+    ("full_sync", scenario_full_sync, "zones"),
+    ("inventory", scenario_inventory, "zones"),
+]
+
+
+def run(func, fake, args, memory=True):
+    """Run a scenario, then again under tracemalloc for its peak memory"""
+    gc.collect()
+    timings, items = func(fake, args)
+    total = sum(timings)
+    result = {
+        "runs": len(timings),
+        "items": items,
+        "seconds": total,
+        "throughput": items / total if total else 0.0,
+        "p50": percentile(timings, 0.50),
+        "p95": percentile(timings, 0.95),
+        "p99": percentile(timings, 0.99),
+        "peak_bytes": None,
+    }
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        func(fake, args)
+        result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def report(results, units):
+    print("%-12s %6s %10s %14s %10s %10s %10s %10s" % (
+        "scenario", "runs", "seconds", "throughput", "p50 ms", "p95 ms",
+        "p99 ms", "peak MiB"))
+    for name, result in results.items():
+        peak = result["peak_bytes"]
+        print("%-12s %6d %10.3f %8.1f %-5s %10.2f %10.2f %10.2f %10s" % (
+            name, result["runs"], result["seconds"], result["throughput"],
+            units[name] + "/s", result["p50"] * 1000, result["p95"] * 1000,
+            result["p99"] * 1000, "-" if peak is None else "%.1f" % (peak / 2. ** 20)))
+
+
+def compare(results, baseline, threshold):
+    """Print time ratios against a baseline, return regressed scenarios"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before or not before["p50"]:
+            continue
+        ratio = result["p50"] / before["p50"]
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print("%-12s p50 %.2fx of baseline%s" % (name, ratio, flag))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--zones", type=int, default=100,
+                        help="zones of the cold start and full sync server")
+    parser.add_argument("--records", type=int, default=200,
+                        help="A records per zone")
+    parser.add_argument("--inventory-zones", type=int, default=10000,
+                        help="zones of the inventory server")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds added by the fake API to each request")
+    parser.add_argument("--edits", type=int, default=200,
+                        help="single record edits")
+    parser.add_argument("--syncs", type=int, default=20,
+                        help="zones fully synchronized")
+    parser.add_argument("--inventories", type=int, default=5,
+                        help="zone list loads of the inventory scenario")
+    parser.add_argument("--scenario", action="append",
+                        choices=[name for name, _, _ in SCENARIOS],
+                        help="scenario to run, all by default")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the peak memory pass")
+    parser.add_argument("--save", metavar="FILE", help="save results as JSON")
+    parser.add_argument("--compare", metavar="FILE",
+                        help="compare with results saved by --save")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative p50 slowdown reported as regression")
+    args = parser.parse_args()
+
+    results = {}
+    units = {}
+    for name, func, unit in SCENARIOS:
+        if args.scenario and name not in args.scenario:
+            continue
+        if name == "inventory":
+            fake = FakePDNS(zones=args.inventory_zones, records=0,
+                            latency=args.latency)
+        else:
+            fake = FakePDNS(zones=args.zones, records=args.records,
+                            latency=args.latency)
+        with fake:
+            results[name] = run(func, fake, args, not args.no_memory)
+            results[name]["requests"] = fake.requests
+        units[name] = unit
+
+    report(results, units)
+    if args.save:
+        with open(args.save, "w") as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as baseline:
+            if compare(results, json.load(baseline), args.threshold):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+bench_serializer - Serialization time of a zone PATCH payload
+
+Encodes ``{"rrsets": [...]}`` for a generated zone with every available
+serializer backend, and with the previous encoder (printing every rrset to
+stdout, here discarded, and copying its details).
+
+Usage::
+
+    python benchmarks/bench_serializer.py --rrsets 100000
+"""
+
+import argparse
+import contextlib
+import copy
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+from powerdns.encoder import SERIALIZERS  # noqa: E402
+from powerdns.models.rrset import RRSet  # noqa: E402
+
+
+class LegacyEncoder(json.JSONEncoder):
+    """Previous encoder behaviour"""
+
+    def default(self, obj):
+        print(obj)
+        if isinstance(obj, RRSet):
+            data = copy.copy(obj.json())
+            return data
+        return obj
+
+
+def build_rrsets(count):
+    return [RRSet(name="host%d.example.org." % i, rtype="A", ttl=3600,
+                  records=[{"content": "10.%d.%d.%d" % (i >> 16 & 255,
+                                                      i >> 8 & 255, i & 255),
+                            "disabled": False}])
+            for i in range(count)]
+
+
+def timeit(func, rounds):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--rrsets", type=int, default=100000,
+                        help="number of rrsets in the payload")
+    parser.add_argument("--rounds", type=int, default=5,
+                        help="runs per backend, best one is reported")
+    args = parser.parse_args()
+
+    payload = {"rrsets": build_rrsets(args.rrsets)}
+    with open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(devnull):
+        results = [("legacy encoder",
+                    timeit(lambda: json.dumps(payload, cls=LegacyEncoder),
+                           args.rounds))]
+    for name, backend in sorted(SERIALIZERS.items()):
+        try:
+            serializer = backend()
+        except ImportError:
+            print("%-16s not installed" % name)
+            continue
+        results.append((name, timeit(lambda: serializer.dumps(payload),
+                                     args.rounds)))
+
+    baseline = results[0][1]
+    for name, elapsed in results:
+        print("%-16s %8.1f ms  %6.2fx" % (name, elapsed * 1000,
+                                          baseline / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+fake_pdns - In-process fake PowerDNS HTTP API for benchmarks
+
+Implements the subset of the API used by the library:
+
+* ``GET /servers`` and ``GET /servers/{id}``
+* ``GET`` and ``POST /servers/{id}/zones``
+* ``GET``, ``PATCH``, ``PUT`` and ``DELETE /servers/{id}/zones/{zone}``,
+  ``?rrsets=false`` included
+* ``GET /servers/{id}/search-data``
+
+Zones live in memory, changes bump their serial. Response bodies are
+encoded once per serial so the server costs as little as possible to the
+measured client. A fixed *latency* can be added to every request.
+
+Usage::
+
+    with FakePDNS(zones=100, records=50, latency=0.002) as fake:
+        api_client = PDNSApiClient(fake.url, "changeme")
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+API_PREFIX = "/api/v1"
+
+_SERVER_RE = re.compile(r"^/servers/([^/]+)$")
+_ZONES_RE = re.compile(r"^/servers/([^/]+)/zones$")
+_ZONE_RE = re.compile(r"^/servers/([^/]+)/zones/([^/]+)$")
+_SEARCH_RE = re.compile(r"^/servers/([^/]+)/search-data$")
+
+
+def make_rrsets(name, records):
+    """Build the rrsets of a zone
+
+    :param str name: Zone name
+    :param int records: Number of A records
+    :return: Rrsets as list of :class:`dict`
+    """
+    rrsets = [
+        {"name": name, "type": "SOA", "ttl": 3600, "comments": [],
+         "records": [{"content": "ns1.%s hostmaster.%s 1 10800 3600 604800 3600"
+                                 % (name, name), "disabled": False}]},
+        {"name": name, "type": "NS", "ttl": 3600, "comments": [],
+         "records": [{"content": "ns1.%s" % name, "disabled": False},
+                     {"content": "ns2.%s" % name, "disabled": False}]},
+    ]
+    for index in range(records):
+        rrsets.append({"name": "host%d.%s" % (index, name), "type": "A",
+                       "ttl": 300, "comments": [],
+                       "records": [{"content": "10.%d.%d.%d" % (index >> 16 & 255,
+                                                               index >> 8 & 255,
+                                                               index & 255),
+                                    "disabled": False}]})
+    return rrsets
+
+
+class FakeZone(object):
+    """Zone stored by the fake API"""
+
+    def __init__(self, server_id, name, rrsets, kind="Native", serial=1):
+        self.server_id = server_id
+        self.name = name
+        self.kind = kind
+        self.serial = serial
+        self.rrsets = {(rrset["name"], rrset["type"]): rrset for rrset in rrsets}
+        self._bodies = {}
+
+    def details(self):
+        return {
+            "id": self.name,
+            "name": self.name,
+            "type": "Zone",
+            "url": "%s/servers/%s/zones/%s" % (API_PREFIX, self.server_id, self.name),
+            "kind": self.kind,
+            "serial": self.serial,
+            "notified_serial": self.serial,
+            "masters": [],
+            "dnssec": False,
+            "account": "",
+            "last_check": 0,
+        }
+
+    def body(self, rrsets=True):
+        """Encoded zone, cached until the next change"""
+        key = (self.serial, rrsets)
+        body = self._bodies.get(key)
+        if body is None:
+            data = self.details()
+            if rrsets:
+                data["rrsets"] = list(self.rrsets.values())
+            body = json.dumps(data).encode()
+            self._bodies = {key: body}
+        return body
+
+    def patch(self, rrsets):
+        for rrset in rrsets:
+            key = (rrset["name"], rrset["type"])
+            if rrset.get("changetype", "REPLACE").upper() == "DELETE":
+                self.rrsets.pop(key, None)
+            else:
+                self.rrsets[key] = {name: value for name, value in rrset.items()
+                                    if name != "changetype"}
+        self.serial += 1
+
+
+class FakePDNSHandler(BaseHTTPRequestHandler):
+    """Request handler of :class:`FakePDNS`"""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body=b""):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self):
+        fake = self.server.fake
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = self.rfile.read(length) if length else b""
+        data = json.loads(payload) if payload.strip() else {}
+        if fake.latency:
+            time.sleep(fake.latency)
+        url = urlparse(self.path)
+        path = url.path[len(API_PREFIX):] if url.path.startswith(API_PREFIX) \
+            else url.path
+        with fake.lock:
+            fake.requests += 1
+            status, body = fake.dispatch(self.command, path, parse_qs(url.query), data)
+        self._reply(status, body)
+
+    do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _handle
+
+
+class FakePDNS(object):
+    """Fake PowerDNS API served from a background thread
+
+    :param int zones: Number of zones created on the server
+    :param int records: Number of A records of each zone
+    :param float latency: Seconds added to every request
+    :param str server_id: Id of the single server
+    """
+    def __init__(self, zones=10, records=100, latency=0.0, server_id="localhost"):
+        """Initialization"""
+        self.latency = latency
+        self.server_id = server_id
+        self.lock = threading.Lock()
+        #: Number of requests served
+        self.requests = 0
+        self.zones = {}
+        for index in range(zones):
+            self.add_zone("zone%d.example." % index, records)
+        self._httpd = None
+        self._list_body = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def url(self):
+        """API endpoint to give to the client"""
+        return "http://%s:%d%s" % (self._httpd.server_address + (API_PREFIX,))
+
+    def start(self):
+        """Start serving"""
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakePDNSHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        """Stop serving"""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def add_zone(self, name, records=0, rrsets=None, kind="Native"):
+        """Create a zone"""
+        self.zones[name] = FakeZone(self.server_id, name,
+                                    make_rrsets(name, records) if rrsets is None
+                                    else rrsets, kind)
+        self._list_body = None
+        return self.zones[name]
+
+    def _zone_list(self):
+        if self._list_body is None:
+            self._list_body = json.dumps([zone.details() for zone in
+                                          self.zones.values()]).encode()
+        return self._list_body
+
+    def dispatch(self, method, path, query, data):
+        """Serve a request, return status and body"""
+        if path == "/servers":
+            return 200, [self._server()]
+        match = _SERVER_RE.match(path)
+        if match:
+            if match.group(1) != self.server_id:
+                return 404, {"error": "Not found"}
+            return 200, self._server()
+        match = _ZONES_RE.match(path)
+        if match:
+            if method == "POST":
+                if data.get("name") in self.zones:
+                    return 409, {"error": "Conflict"}
+                zone = self.add_zone(data["name"], rrsets=data.get("rrsets", []),
+                                     kind=data.get("kind", "Native"))
+                return 201, zone.body()
+            return 200, self._zone_list()
+        match = _ZONE_RE.match(path)
+        if match:
+            zone = self.zones.get(match.group(2))
+            if zone is None:
+                return 422, {"error": "Could not find domain '%s'" % match.group(2)}
+            if method == "GET":
+                return 200, zone.body(query.get("rrsets", ["true"])[0] != "false")
+            if method == "PATCH":
+                zone.patch(data.get("rrsets", []))
+                self._list_body = None
+                return 204, b""
+            if method == "PUT":
+                zone.kind = data.get("kind", zone.kind)
+                zone.serial += 1
+                self._list_body = None
+                return 204, b""
+            if method == "DELETE":
+                del self.zones[zone.name]
+                self._list_body = None
+                return 204, b""
+        match = _SEARCH_RE.match(path)
+        if match:
+            return 200, self._search(query)
+        return 404, {"error": "Not found"}
+
+    def _server(self):
+        return {"id": self.server_id, "type": "Server", "version": "4.8.0",
+                "daemon_type": "authoritative",
+                "url": "%s/servers/%s" % (API_PREFIX, self.server_id)}
+
+    def _search(self, query):
+        pattern = re.escape(query.get("q", [""])[0]).replace(r"\*", ".*")
+        pattern = re.compile("^%s$" % pattern.replace(r"\?", "."), re.I)
+        max_results = int(query.get("max", ["100"])[0])
+        object_type = query.get("object_type", ["all"])[0]
+        results = []
+        for zone in self.zones.values():
+            if object_type in ("all", "zone") and pattern.match(zone.name):
+                results.append({"object_type": "zone", "name": zone.name,
+                                "zone_id": zone.name, "zone": zone.name})
+            if object_type not in ("all", "record"):
+                continue
+            for rrset in zone.rrsets.values():
+                for record in rrset["records"]:
+                    if pattern.match(rrset["name"]) or pattern.match(record["content"]):
+                        results.append({"object_type": "record", "name": rrset["name"],
+                                        "type": rrset["type"], "ttl": rrset["ttl"],
+                                        "content": record["content"],
+                                        "disabled": record["disabled"],
+                                        "zone_id": zone.name, "zone": zone.name})
+                if len(results) >= max_results:
+                    return results[:max_results]
+        return results[:max_results]
@@ -23,11 +23,19 @@ powerdns - PowerDNS API client and interface
 
 import logging
 from logging.handlers import SysLogHandler
-from .client import PDNSApiClient
+from .client import PDNSApiClient, AsyncPDNSApiClient
+from .cache import ZoneCache
+from .snapshot import SnapshotStore
+from .retry import RetryPolicy, CircuitBreaker
+from .scheduler import RateLimiter, RequestScheduler, request_priority
 from powerdns.models.endpoint import PDNSEndpoint
 from powerdns.models.rrset import RRSet
 from powerdns.models.server import PDNSServer
 from powerdns.models.zone import PDNSZone
+from .journal import WriteBehindJournal
+from .reconcile import Reconciler
+from .resolver import Resolver
+from .bulk import BulkLoader
 
 #: Current version of the package as :class:`str`.
 __version__ = "0.0.1"
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+powerdns.bulk - Bulk zone loading with parsing in a process pool
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from powerdns.encoder import get_serializer
+from powerdns.exceptions import PDNSCanonicalError
+from powerdns.fanout import FanOutResult, fan_out
+from powerdns.interface import LOG
+
+
+def canonical_rrset(data, zone):
+    """Make the names of a compact rrset canonical
+
+    Same rules as :meth:`~powerdns.models.rrset.RRSet.ensure_canonical`:
+    relative names, and CNAME contents, are completed with the zone name.
+
+    :param tuple data: ``(name, rtype, ttl, records)``, see
+                       :meth:`~powerdns.models.rrset.RRSet.to_tuple`
+    :param str zone: Zone name, canonical
+    :return: Canonical rrset as :class:`tuple`
+    """
+    if not zone.endswith("."):
+        raise PDNSCanonicalError(zone)
+    name, rtype, ttl, records = data
+    if not name.endswith("."):
+        name = "%s.%s" % (name, zone)
+    if rtype == "CNAME":
+        records = tuple((content if content.endswith(".") else "%s.%s" % (content, zone),
+                         disabled) for content, disabled in records)
+    return name, rtype, ttl, records
+
+
+def parse_zone(body, serializer=None, canonical=True):
+    """Parse a zone response into its compact form
+
+    Run in worker processes by :class:`BulkLoader`, the result is cheap to
+    pickle and to load with
+    :meth:`~powerdns.models.zone.PDNSZone._load_compact`.
+
+    :param bytes body: Zone response body
+    :param str serializer: Serializer backend name
+    :param bool canonical: Make rrset names canonical
+    :return: Zone details without rrsets as :class:`dict`, and rrsets as
+             tuple of ``(name, rtype, ttl, records)`` tuples
+    """
+    details = get_serializer(serializer).loads(body)
+    raw_rrsets = details.pop("rrsets", None) or ()
+    details.pop("url", None)
+    zone = details.get("name")
+    rrsets = []
+    for raw in raw_rrsets:
+        data = (raw["name"], raw["type"], raw["ttl"],
+                tuple([(record["content"], bool(record.get("disabled", False)))
+                       for record in raw["records"]]))
+        if canonical:
+            data = canonical_rrset(data, zone)
+        rrsets.append(data)
+    return details, tuple(rrsets)
+
+
+class BulkLoader(object):
+    """Load the details and rrsets of many zones using every core
+
+    Zones are requested concurrently by *max_workers* threads, their
+    response bodies are parsed and normalized by *processes* worker
+    processes, and the parent only rebuilds the model objects from compact
+    tuples. With ``processes=0``, bodies are parsed by the requesting
+    threads, which the GIL serializes.
+
+    The process pool is started on first use and reused, close the loader
+    once done or use it as a context manager::
+
+        with BulkLoader() as loader:
+            loader.load(endpoint.all_zones())
+
+    :param int processes: Number of worker processes, the number of CPUs
+                          by default
+    :param int max_workers: Maximum number of concurrent requests
+    :param bool canonical: Make rrset names canonical in the workers
+    """
+    def __init__(self, processes=None, max_workers=8, canonical=True):
+        """Initialization"""
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        self.max_workers = max_workers
+        self.canonical = canonical
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def start(self):
+        """Start the worker processes, so the first load does not pay for it"""
+        if self._executor is None and self.processes > 0:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes)
+            list(self._executor.map(int, range(self.processes)))
+        return self
+
+    def close(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def load(self, zones):
+        """
+            Load the details and rrsets of zones
+
+            Errors do not stop the other zones, they are collected. Loaded
+            zones are written to the zone cache and snapshot store of their
+            server, if any.
+
+            :param list zones: Zones as :class:`PDNSZone`, with synchronous
+                               API clients
+            :return: List of :class:`~powerdns.fanout.FanOutResult` holding
+                     the zones, in the order of *zones*
+        """
+        self.start()
+        fetched = fan_out(self._fetch, zones, self.max_workers)
+        results = []
+        for result in fetched:
+            zone = result.item
+            if not result.ok:
+                results.append(result)
+                continue
+            try:
+                details, rrsets = result.value.result() \
+                    if self._executor is not None else result.value
+            except Exception as error:
+                LOG.error("parsing zone %s failed: %s", zone.get("name"), error)
+                results.append(FanOutResult(zone, error=error))
+                continue
+            zone._load_compact(details, rrsets)
+            zone._store_in_cache()
+            results.append(FanOutResult(zone, zone))
+        LOG.info("%d zones loaded with %d processes", len(results), self.processes)
+        return results
+
+    def _fetch(self, zone):
+        """Request a zone body and hand it to a worker"""
+        if zone.is_async():
+            raise RuntimeError("Bulk loading requires a synchronous API client")
+        body = zone._get(zone.get_url(), decode=False)
+        serializer = getattr(getattr(zone.get_api_client(), "_serializer", None), "name", None)
+        if self._executor is None:
+            return parse_zone(body, serializer, self.canonical)
+        return self._executor.submit(parse_zone, body, serializer, self.canonical)
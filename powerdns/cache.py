@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+powerdns.cache - Serial-aware zone cache
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from powerdns.interface import LOG
+
+
+def estimate_size(details, rrsets):
+    """Estimate the memory footprint of cached zone data
+
+    :param dict details: Zone details without rrsets
+    :param tuple rrsets: Rrsets as :meth:`RRSet.to_tuple` tuples
+    :return: Estimated size in bytes as :class:`int`
+    """
+    getsizeof = sys.getsizeof
+    size = getsizeof(details) + getsizeof(rrsets)
+    for name, rtype, ttl, records in rrsets:
+        size += getsizeof(name) + 4 * 8 + 56
+        if records:
+            size += getsizeof(records)
+            for content, disabled in records:
+                size += getsizeof(content) + 56
+    return size
+
+
+class CacheEntry(object):
+    """Cached zone data
+
+    :param serial: Zone serial the data was loaded at
+    :param dict details: Zone details without rrsets
+    :param tuple rrsets: Rrsets as :meth:`RRSet.to_tuple` tuples
+    """
+    __slots__ = ("serial", "details", "rrsets", "size", "created")
+
+    def __init__(self, serial, details, rrsets):
+        """Initialization"""
+        self.serial = serial
+        self.details = details
+        self.rrsets = rrsets
+        self.size = estimate_size(details, rrsets)
+        self.created = time.monotonic()
+
+
+class ZoneCache(object):
+    """Cache of zone details and rrsets validated by zone serial
+
+    The zone list carries ``serial`` for every zone at the cost of a single
+    request, so cached rrsets stay valid as long as the listed serial did
+    not move. Entries are evicted least recently used first once the
+    estimated footprint exceeds *max_bytes*, and expire after *ttl*
+    seconds whatever their serial.
+
+    :param int max_bytes: Maximum estimated memory footprint
+    :param float ttl: Maximum age of an entry in seconds, no limit if
+                      :obj:`None`
+
+    It is shared by passing it to :class:`~powerdns.PDNSEndpoint`::
+
+        endpoint = PDNSEndpoint(api_client, zone_cache=ZoneCache())
+    """
+    def __init__(self, max_bytes=256 * 1024 * 1024, ttl=None):
+        """Initialization"""
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        #: Hit, miss, stale serial, expiration and eviction counters
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "expired": 0,
+            "evictions": 0,
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def size(self):
+        """Estimated memory footprint of cached entries in bytes"""
+        return self._size
+
+    def get(self, key, serial):
+        """Get zone data if cached at this serial
+
+        :param tuple key: Zone key as ``(server_id, zone_name)``
+        :param serial: Current zone serial
+        :return: :class:`CacheEntry` or :obj:`None`
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            if entry.serial != serial:
+                self.stats["stale"] += 1
+                self._remove(key)
+                return None
+            if self.ttl is not None and \
+                    time.monotonic() - entry.created > self.ttl:
+                self.stats["expired"] += 1
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry
+
+    def put(self, key, serial, details, rrsets):
+        """Cache zone data
+
+        :param tuple key: Zone key as ``(server_id, zone_name)``
+        :param serial: Zone serial the data was loaded at
+        :param dict details: Zone details without rrsets
+        :param tuple rrsets: Rrsets as :meth:`RRSet.to_tuple` tuples
+        """
+        entry = CacheEntry(serial, details, rrsets)
+        with self._lock:
+            self._remove(key)
+            if entry.size > self.max_bytes:
+                LOG.debug("zone %s too large to be cached", key)
+                return
+            self._entries[key] = entry
+            self._size += entry.size
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def invalidate(self, key):
+        """Drop a cached zone
+
+        :param tuple key: Zone key as ``(server_id, zone_name)``
+        """
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        """Drop every cached zone"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry.size
@@ -21,60 +21,98 @@
 powerdns.client - PowerDNS API client
 """
 
-import json
+import asyncio
 import logging
+import time
 from functools import partial
 import requests
-from .exceptions import PDNSError
-from powerdns.encoder import PDNSJsonEncoder
+from requests.adapters import HTTPAdapter
+from .exceptions import PDNSError, PDNSCircuitOpenError
+from powerdns.encoder import get_serializer
+from powerdns.metrics import RequestInfo, path_template, run_hooks
+from powerdns.retry import parse_retry_after
+from powerdns.scheduler import RequestScheduler
+from powerdns.singleflight import SingleFlight
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
 
 LOG = logging.getLogger(__name__)
 
+#: Maximum number of characters of request and response bodies logged
+LOG_BODY_LIMIT = 2048
 
-class PDNSApiClient(object):
-    """Powerdns API client
-
-    It implements common HTTP methods GET, POST, PUT, PATCH and DELETE
-
-    This client is using :mod:`requests` package. Please see
-    http://docs.python-requests.org/ for more information.
 
-    :param str api_endpoint: Powerdns API endpoint
-    :param str api_key: API key
-    :param bool verify: Control SSL certificate validation
-    :param int timeout: Request timeout in seconds
-
-    .. method:: get(self, path, data=None, **kwargs)
-
-        Partial method invoking :meth:`~PDNSApiClient.request` with
-        http method *GET*.
-
-    .. method:: post(self, path, data=None, **kwargs)
-
-        Partial method invoking :meth:`~PDNSApiClient.request` with
-        http method *POST*.
+class _Excerpt(object):
+    """Request or response body, decoded and truncated only when logged"""
+    __slots__ = ("data",)
 
-    .. method:: put(self, path, data=None, **kwargs)
+    def __init__(self, data):
+        self.data = data
 
-        Partial method invoking :meth:`~PDNSApiClient.request` with
-        http method *PUT*.
+    def __str__(self):
+        data = self.data[:LOG_BODY_LIMIT]
+        if isinstance(data, bytes):
+            data = data.decode("utf-8", "replace")
+        if len(self.data) > LOG_BODY_LIMIT:
+            data += "... (%d in total)" % len(self.data)
+        return data
 
-    .. method:: patch(self, path, data=None, **kwargs)
 
-        Partial method invoking :meth:`~PDNSApiClient.request` with
-        http method *PATCH*.
+class PDNSApiClientBase(object):
+    """Common behaviour of the synchronous and asynchronous API clients
 
-    .. method:: delete(self, path, data=None, **kwargs)
+    It builds request urls, headers and payloads, and turns API responses
+    into parsed data or :class:`~powerdns.exceptions.PDNSError`.
 
-        Partial method invoking :meth:`~PDNSApiClient.request` with
-        http method *DELETE*.
+    :param str api_endpoint: Powerdns API endpoint
+    :param str api_key: API key
+    :param bool verify: Control SSL certificate validation
+    :param int timeout: Request timeout in seconds
+    :param serializer: JSON serializer backend name (``json`` or
+                       ``orjson``) or instance, defaults to the fastest
+                       installed one, see :func:`powerdns.encoder.get_serializer`
+    :param retry: :class:`~powerdns.retry.RetryPolicy` of failed requests,
+                  no retry if :obj:`None`
+    :param circuit_breaker: :class:`~powerdns.retry.CircuitBreaker` of the
+                            API endpoint, optional
+    :param scheduler: :class:`~powerdns.scheduler.RequestScheduler` ordering
+                      requests by priority, optional
+    :param rate_limiter: :class:`~powerdns.scheduler.RateLimiter`, used
+                         through a default scheduler if *scheduler* is not
+                         given
+    :param list hooks: :class:`~powerdns.metrics.RequestHook` instances
+                       called around each request attempt
+    :param bool coalesce: Share one response between concurrent identical
+                          GET requests. A GET joining one sent before a
+                          change made by the caller may not reflect it.
     """
-    def __init__(self, api_endpoint, api_key, verify=True, timeout=None):
+    #: Tell models whether the HTTP methods return coroutines
+    is_async = False
+    #: Exceptions of the HTTP library raised when the API is unreachable
+    transient_errors = ()
+
+    def __init__(self, api_endpoint, api_key, verify=True, timeout=None,
+                 serializer=None, retry=None, circuit_breaker=None,
+                 scheduler=None, rate_limiter=None, hooks=None,
+                 coalesce=False):
         """Initialization"""
         self._api_endpoint = api_endpoint
         self._api_key = api_key
         self._verify = verify
         self._timeout = timeout
+        self._serializer = get_serializer(serializer)
+        self.retry = retry
+        self.circuit_breaker = circuit_breaker
+        if scheduler is None and rate_limiter is not None:
+            scheduler = RequestScheduler(rate_limiter)
+        self.scheduler = scheduler
+        self.hooks = list(hooks or [])
+        #: :class:`~powerdns.singleflight.SingleFlight` coalescing GET
+        #: requests, its ``stats`` count deduplicated requests
+        self.single_flight = SingleFlight() if coalesce else None
 
         if not verify:
             LOG.debug("removing insecure https connection warnings")
@@ -83,7 +121,8 @@ class PDNSApiClient(object):
 
         self.request_headers = {
             'Content-Type': 'application/json',
-            'Accept': 'application/json'
+            'Accept': 'application/json',
+            'Connection': 'keep-alive'
         }
 
         # Directly expose common HTTP methods
@@ -93,18 +132,26 @@ class PDNSApiClient(object):
         self.patch = partial(self.request, method='PATCH')
         self.delete = partial(self.request, method='DELETE')
 
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__, self._api_endpoint)
+
     def request(self, path, method, data=None, **kwargs):
-        """Handle requests to API
+        raise NotImplementedError
+
+    def add_hook(self, hook):
+        """Add a request hook
+
+        :param hook: :class:`~powerdns.metrics.RequestHook` instance
+        """
+        self.hooks.append(hook)
+
+    def _prepare_request(self, path, method, data=None):
+        """Build request url and serialized payload
 
         :param str path: API endpoint's path to request
         :param str method: HTTP method to use
         :param dict data: Data to send (optional)
-        :return: Parsed json response as :class:`dict`
-
-        Additional named argument may be passed and are directly transmitted
-        to :meth:`request` method of :class:`requests.Session` object.
-
-        :raise PDNSError: If request's response is an error.
+        :return: Request url and payload as :class:`tuple`
         """
         if self._api_key:
             self.request_headers['X-API-Key'] = self._api_key
@@ -119,40 +166,173 @@ class PDNSApiClient(object):
 
         if data is None:
             data = {}
-        data = json.dumps(data, cls=PDNSJsonEncoder)
+        data = self._serializer.dumps(data)
 
         LOG.info("request: %s %s", method, url)
         LOG.debug("headers: %s", self.request_headers)
-        LOG.debug("data: %s", data)
+        LOG.debug("data: %s", _Excerpt(data))
+        return url, data
 
-        response = requests.request(method, url,
-                                    data=data,
-                                    headers=self.request_headers,
-                                    timeout=self._timeout,
-                                    verify=self._verify,
-                                    **kwargs)
+    def _start_attempt(self, method, url, data, attempt, serialization_time):
+        """Call hooks before a request attempt
 
-        LOG.info("request response code: %d", response.status_code)
-        LOG.debug("response: %s", response.text)
+        :return: :class:`~powerdns.metrics.RequestInfo`, or :obj:`None`
+                 without hooks
+        """
+        if not self.hooks:
+            return None
+        info = RequestInfo(method, url,
+                           path_template(self._schedule_path(url)),
+                           attempt=attempt,
+                           bytes_sent=len(data),
+                           serialization_time=0.0 if attempt else serialization_time)
+        run_hooks(self.hooks, "before_request", info)
+        return info
+
+    def _end_attempt(self, info, error=None):
+        """Call hooks after a request attempt"""
+        if info is None:
+            return
+        info.finish(error)
+        run_hooks(self.hooks, "after_request", info)
+
+    def _schedule_path(self, url):
+        """Get the path of a request url matched by rate limits"""
+        if url.startswith(self._api_endpoint):
+            return url[len(self._api_endpoint):]
+        return url
+
+    def _check_circuit(self, url):
+        """Fail fast if the circuit breaker is open
+
+        :raise PDNSCircuitOpenError: If the request must not be sent
+        """
+        if self.circuit_breaker is None:
+            return
+        wait = self.circuit_breaker.allow()
+        if wait is not None:
+            LOG.error("circuit open, not requesting %s", url)
+            raise PDNSCircuitOpenError(url, wait)
+
+    def _is_transient(self, error):
+        """Tell whether an error means the API is unreachable or failing"""
+        if isinstance(error, PDNSError):
+            return error.status_code >= 500
+        return isinstance(error, self.transient_errors)
+
+    def _attempt_succeeded(self):
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record_success()
+
+    def _end_stream(self, info, error, succeeded):
+        """Call hooks and resolve the circuit breaker after a streamed request
+
+        Success is recorded as soon as a successful status is received, the
+        trial of a half-open circuit is resolved here otherwise, whatever
+        ended the stream.
+
+        :param RequestInfo info: Request measures, or :obj:`None`
+        :param Exception error: Error raised by the request, if any
+        :param bool succeeded: Success was already recorded
+        """
+        self._end_attempt(info, error)
+        if self.circuit_breaker is None:
+            return
+        if error is not None and self._is_transient(error):
+            self.circuit_breaker.record_failure()
+        elif not succeeded:
+            self.circuit_breaker.record_success()
+
+    def _attempt_failed(self, method, url, attempt, error):
+        """Account for a failed attempt
+
+        :param str method: HTTP method
+        :param str url: Requested url
+        :param int attempt: Number of the failed attempt, from 0
+        :param Exception error: Error raised by the attempt
+        :return: Delay in seconds before retrying, or :obj:`None` if the
+                 error must be raised
+        """
+        transient = self._is_transient(error)
+        if self.circuit_breaker is not None:
+            if transient:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+        if self.retry is None:
+            return None
+        delay = self.retry.get_delay(method, attempt, error, transient)
+        if delay is not None:
+            LOG.warning("request %s %s failed (%s), retry %d/%d in %.2fs",
+                        method, url, error, attempt + 1,
+                        self.retry.max_attempts - 1, delay)
+        return delay
+
+    def _coalesce_key(self, method, url, data, kwargs):
+        """Get the key of a request to coalesce, :obj:`None` if it can't"""
+        if self.single_flight is None or method != "GET" or kwargs:
+            return None
+        return method, url, data
+
+    def _decode(self, raw, info, network_time, shared=False, decode=True):
+        """Handle a raw response for one caller, accounting for it
+
+        :param tuple raw: Url, status code, body and headers
+        :param RequestInfo info: Request measures, or :obj:`None`
+        :param float network_time: Seconds spent obtaining the response
+        :param bool shared: The response was obtained by another caller
+        :param bool decode: Parse a successful response body
+        """
+        if info is None:
+            return self._handle_response(*raw, decode=decode)
+        info.status = raw[1]
+        info.bytes_received = len(raw[2])
+        info.network_time = network_time
+        info.shared = shared
+        started = time.perf_counter()
+        try:
+            return self._handle_response(*raw, decode=decode)
+        finally:
+            info.serialization_time += time.perf_counter() - started
+
+    def _handle_response(self, url, status_code, text, headers=None,
+                         decode=True):
+        """Parse API response or raise the matching error
+
+        :param str url: Requested url
+        :param int status_code: HTTP status code of the response
+        :param text: Response body as :class:`bytes` or :class:`str`
+        :param headers: Response headers, for ``Retry-After``
+        :param bool decode: Parse a successful response body
+        :return: Parsed json response as :class:`dict`, or the body if not
+                 *decode*
+        :raise PDNSError: If request's response is an error.
+        """
+        LOG.info("request response code: %d", status_code)
+        LOG.debug("response: %s", _Excerpt(text))
 
         # Try to handle basic return
-        if response.status_code in [200, 201]:
-            return response.json()
-        elif response.status_code == 204:
+        if status_code in [200, 201]:
+            return self._serializer.loads(text) if decode else text
+        elif status_code == 204:
             return ""
-        elif response.status_code == 404:
+        elif status_code == 404:
             error_message = 'Not found'
         else:
             try:
-                error_message = self._get_error(response=response.json())
+                error_message = self._get_error(
+                    response=self._serializer.loads(text))
             except Exception:
-                error_message = response.text
+                error_message = text.decode("utf-8", "replace") \
+                    if isinstance(text, bytes) else text
 
-        LOG.error("raising error code %d", response.status_code)
+        LOG.error("raising error code %d", status_code)
         LOG.debug("error response: %s", error_message)
-        raise PDNSError(url=response.url,
-                        status_code=response.status_code,
-                        message=error_message)
+        raise PDNSError(url=url,
+                        status_code=status_code,
+                        message=error_message,
+                        retry_after=parse_retry_after(
+                            headers.get('Retry-After') if headers else None))
 
     @staticmethod
     def _get_error(response):
@@ -168,3 +348,537 @@ class PDNSApiClient(object):
         else:
             err = 'No error message found'
         return err
+
+
+class PDNSApiClient(PDNSApiClientBase):
+    """Powerdns API client
+
+    It implements common HTTP methods GET, POST, PUT, PATCH and DELETE
+
+    This client is using :mod:`requests` package. Please see
+    http://docs.python-requests.org/ for more information.
+
+    :param str api_endpoint: Powerdns API endpoint
+    :param str api_key: API key
+    :param bool verify: Control SSL certificate validation
+    :param int timeout: Request timeout in seconds
+    :param int pool_connections: Number of per-host connection pools to
+                                 cache
+    :param int pool_maxsize: Maximum number of connections kept alive in
+                             each per-host pool
+    :param bool pool_block: Block when a host pool is exhausted instead of
+                            opening extra, non-reused connections
+    :param serializer: JSON serializer backend, see
+                       :class:`PDNSApiClientBase`
+    :param retry: :class:`~powerdns.retry.RetryPolicy`, see
+                  :class:`PDNSApiClientBase`
+    :param circuit_breaker: :class:`~powerdns.retry.CircuitBreaker`, see
+                            :class:`PDNSApiClientBase`
+    :param scheduler: :class:`~powerdns.scheduler.RequestScheduler`, see
+                      :class:`PDNSApiClientBase`
+    :param rate_limiter: :class:`~powerdns.scheduler.RateLimiter`, see
+                         :class:`PDNSApiClientBase`
+    :param list hooks: Request hooks, see :class:`PDNSApiClientBase`
+    :param bool coalesce: Coalesce identical GET requests, see
+                          :class:`PDNSApiClientBase`
+
+    Requests are sent through a persistent :class:`requests.Session` so TCP
+    connections (and TLS sessions) are kept alive and reused between calls.
+    The client should be closed with :meth:`close` once done, or used as a
+    context manager::
+
+        with PDNSApiClient(api_endpoint, api_key) as api_client:
+            endpoint = PDNSEndpoint(api_client)
+
+    .. method:: get(self, path, data=None, **kwargs)
+
+        Partial method invoking :meth:`~PDNSApiClient.request` with
+        http method *GET*.
+
+    .. method:: post(self, path, data=None, **kwargs)
+
+        Partial method invoking :meth:`~PDNSApiClient.request` with
+        http method *POST*.
+
+    .. method:: put(self, path, data=None, **kwargs)
+
+        Partial method invoking :meth:`~PDNSApiClient.request` with
+        http method *PUT*.
+
+    .. method:: patch(self, path, data=None, **kwargs)
+
+        Partial method invoking :meth:`~PDNSApiClient.request` with
+        http method *PATCH*.
+
+    .. method:: delete(self, path, data=None, **kwargs)
+
+        Partial method invoking :meth:`~PDNSApiClient.request` with
+        http method *DELETE*.
+    """
+    transient_errors = (requests.ConnectionError, requests.Timeout)
+
+    def __init__(self, api_endpoint, api_key, verify=True, timeout=None,
+                 pool_connections=10, pool_maxsize=10, pool_block=False,
+                 serializer=None, retry=None, circuit_breaker=None,
+                 scheduler=None, rate_limiter=None, hooks=None,
+                 coalesce=False):
+        """Initialization"""
+        super(PDNSApiClient, self).__init__(api_endpoint, api_key,
+                                           verify=verify, timeout=timeout,
+                                           serializer=serializer,
+                                           retry=retry,
+                                           circuit_breaker=circuit_breaker,
+                                           scheduler=scheduler,
+                                           rate_limiter=rate_limiter,
+                                           hooks=hooks,
+                                           coalesce=coalesce)
+        self._session = self._build_session(pool_connections, pool_maxsize,
+                                            pool_block)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _build_session(pool_connections, pool_maxsize, pool_block):
+        """Build the pooled HTTP session
+
+        :param int pool_connections: Number of per-host pools to cache
+        :param int pool_maxsize: Maximum kept-alive connections per host
+        :param bool pool_block: Block when a host pool is exhausted
+        :return: Session as :class:`requests.Session`
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize,
+                              pool_block=pool_block)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def close(self):
+        """Close the underlying session and release pooled connections"""
+        LOG.debug("closing api client session")
+        self._session.close()
+
+    def request(self, path, method, data=None, priority=None, decode=True,
+                **kwargs):
+        """Handle requests to API
+
+        :param str path: API endpoint's path to request
+        :param str method: HTTP method to use
+        :param dict data: Data to send (optional)
+        :param int priority: Scheduling priority, defaults to
+                             :func:`~powerdns.scheduler.current_priority`
+        :param bool decode: Parse the response, its body is returned as
+                            :class:`bytes` otherwise
+        :return: Parsed json response as :class:`dict`
+
+        Additional named argument may be passed and are directly transmitted
+        to :meth:`request` method of :class:`requests.Session` object.
+
+        Failed requests are retried according to :attr:`retry`.
+
+        :raise PDNSError: If request's response is an error.
+        :raise PDNSCircuitOpenError: If the circuit breaker is open.
+        """
+        started = time.perf_counter()
+        url, data = self._prepare_request(path, method, data)
+        serialization_time = time.perf_counter() - started
+
+        attempt = 0
+        while True:
+            self._check_circuit(url)
+            info = self._start_attempt(method, url, data, attempt,
+                                       serialization_time)
+            try:
+                result = self._send(url, method, data, priority, info,
+                                    decode, **kwargs)
+            except Exception as error:
+                self._end_attempt(info, error)
+                delay = self._attempt_failed(method, url, attempt, error)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self._end_attempt(info)
+            self._attempt_succeeded()
+            return result
+
+    def _send(self, url, method, data, priority, info=None, decode=True,
+              **kwargs):
+        """Send request and handle its response
+
+        Identical GET requests are coalesced if enabled, then the shared
+        raw response is decoded for each caller.
+        """
+        key = self._coalesce_key(method, url, data, kwargs)
+        if key is None:
+            raw, network_time = self._fetch(url, method, data, priority,
+                                            **kwargs)
+            return self._decode(raw, info, network_time, decode=decode)
+        started = time.perf_counter()
+        (raw, network_time), shared = self.single_flight.do(
+            key, partial(self._fetch, url, method, data, priority))
+        if shared:
+            network_time = time.perf_counter() - started
+        return self._decode(raw, info, network_time, shared, decode)
+
+    def _fetch(self, url, method, data, priority, **kwargs):
+        """Send request when scheduled
+
+        The body is kept as bytes, it is never converted to a string.
+
+        :return: Url, status code, body and headers, and network time
+        """
+        if self.scheduler is not None:
+            self.scheduler.acquire(method, self._schedule_path(url), priority)
+        try:
+            started = time.perf_counter()
+            response = self._session.request(method, url,
+                                             data=data,
+                                             headers=self.request_headers,
+                                             timeout=self._timeout,
+                                             verify=self._verify,
+                                             **kwargs)
+            raw = (response.url, response.status_code, response.content,
+                   response.headers)
+            return raw, time.perf_counter() - started
+        finally:
+            if self.scheduler is not None:
+                self.scheduler.release()
+
+    def request_stream(self, path, method='GET', data=None, chunk_size=65536,
+                       **kwargs):
+        """Handle requests to API whose response is read by chunks
+
+        Large responses are never held in memory at once, see
+        :class:`powerdns.stream.JSONStreamParser` to parse them.
+
+        :param str path: API endpoint's path to request
+        :param str method: HTTP method to use
+        :param dict data: Data to send (optional)
+        :param int chunk_size: Size of read chunks in bytes
+        :return: Generator of response body chunks as :class:`bytes`
+
+        Streamed requests are not retried, part of the body may already
+        have been consumed.
+
+        :raise PDNSError: If request's response is an error.
+        """
+        started = time.perf_counter()
+        url, data = self._prepare_request(path, method, data)
+        serialization_time = time.perf_counter() - started
+        self._check_circuit(url)
+        info = self._start_attempt(method, url, data, 0, serialization_time)
+
+        response = None
+        scheduled = False
+        succeeded = False
+        error = None
+        started = time.perf_counter()
+        try:
+            if self.scheduler is not None:
+                self.scheduler.acquire(method, self._schedule_path(url))
+                scheduled = True
+            response = self._session.request(method, url,
+                                             data=data,
+                                             headers=self.request_headers,
+                                             timeout=self._timeout,
+                                             verify=self._verify,
+                                             stream=True,
+                                             **kwargs)
+            if info is not None:
+                info.status = response.status_code
+            if response.status_code not in [200, 201]:
+                self._handle_response(response.url, response.status_code,
+                                      response.text, response.headers)
+                return
+            LOG.info("request response code: %d (streamed)",
+                     response.status_code)
+            self._attempt_succeeded()
+            succeeded = True
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if info is not None:
+                    info.bytes_received += len(chunk)
+                yield chunk
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            if response is not None:
+                response.close()
+            if scheduled:
+                self.scheduler.release()
+            if info is not None:
+                info.network_time = time.perf_counter() - started
+            self._end_stream(info, error, succeeded)
+
+
+class AsyncPDNSApiClient(PDNSApiClientBase):
+    """Asynchronous Powerdns API client
+
+    It implements the same HTTP methods as :class:`PDNSApiClient`, but every
+    method returns a coroutine. Responses are parsed and errors raised
+    exactly like the synchronous client.
+
+    This client is using :mod:`aiohttp` package, which must be installed
+    separately. Please see https://docs.aiohttp.org/ for more information.
+
+    :param str api_endpoint: Powerdns API endpoint
+    :param str api_key: API key
+    :param bool verify: Control SSL certificate validation
+    :param int timeout: Request timeout in seconds
+    :param int pool_maxsize: Maximum number of simultaneous connections
+    :param int pool_maxsize_per_host: Maximum number of simultaneous
+                                      connections to the same host
+                                      (0 means no limit)
+    :param float keepalive_timeout: Seconds an idle connection is kept alive
+    :param int max_concurrency: Maximum number of in-flight requests, extra
+                                requests wait for a free slot
+                                (:obj:`None` means no limit)
+    :param serializer: JSON serializer backend, see
+                       :class:`PDNSApiClientBase`
+    :param retry: :class:`~powerdns.retry.RetryPolicy`, see
+                  :class:`PDNSApiClientBase`
+    :param circuit_breaker: :class:`~powerdns.retry.CircuitBreaker`, see
+                            :class:`PDNSApiClientBase`
+    :param scheduler: :class:`~powerdns.scheduler.RequestScheduler`, see
+                      :class:`PDNSApiClientBase`
+    :param rate_limiter: :class:`~powerdns.scheduler.RateLimiter`, see
+                         :class:`PDNSApiClientBase`
+    :param list hooks: Request hooks, see :class:`PDNSApiClientBase`
+    :param bool coalesce: Coalesce identical GET requests, see
+                          :class:`PDNSApiClientBase`
+
+    Hundreds of zone operations can safely be gathered at once, the
+    concurrency limit bounds what is actually sent to the API::
+
+        async with AsyncPDNSApiClient(api_endpoint, api_key,
+                                      max_concurrency=20) as api_client:
+            endpoint = PDNSEndpoint(api_client)
+            await endpoint.load_servers_async()
+            server = endpoint.get_server("localhost")
+            zones = await server.load_zones_async()
+            await asyncio.gather(*[zone.save_async() for zone in zones])
+    """
+    is_async = True
+    transient_errors = (asyncio.TimeoutError,) if aiohttp is None else \
+        (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+    def __init__(self, api_endpoint, api_key, verify=True, timeout=None,
+                 pool_maxsize=100, pool_maxsize_per_host=0,
+                 keepalive_timeout=15, max_concurrency=None, serializer=None,
+                 retry=None, circuit_breaker=None, scheduler=None,
+                 rate_limiter=None, hooks=None, coalesce=False):
+        """Initialization"""
+        if aiohttp is None:
+            raise ImportError("AsyncPDNSApiClient requires aiohttp")
+        super(AsyncPDNSApiClient, self).__init__(api_endpoint, api_key,
+                                                verify=verify,
+                                                timeout=timeout,
+                                                serializer=serializer,
+                                                retry=retry,
+                                                circuit_breaker=circuit_breaker,
+                                                scheduler=scheduler,
+                                                rate_limiter=rate_limiter,
+                                                hooks=hooks,
+                                                coalesce=coalesce)
+        self._pool_maxsize = pool_maxsize
+        self._pool_maxsize_per_host = pool_maxsize_per_host
+        self._keepalive_timeout = keepalive_timeout
+        self._max_concurrency = max_concurrency
+        self._semaphore = None
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def _get_session(self):
+        """Get the pooled HTTP session, creating it on first use
+
+        The session is bound to the running event loop, so it can not be
+        created at initialization time.
+
+        :return: Session as :class:`aiohttp.ClientSession`
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._pool_maxsize,
+                limit_per_host=self._pool_maxsize_per_host,
+                keepalive_timeout=self._keepalive_timeout,
+                ssl=None if self._verify else False)
+            timeout = aiohttp.ClientTimeout(total=self._timeout)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=timeout)
+            if self._max_concurrency:
+                self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        return self._session
+
+    async def close(self):
+        """Close the underlying session and release pooled connections"""
+        LOG.debug("closing async api client session")
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def request(self, path, method, data=None, priority=None,
+                      decode=True, **kwargs):
+        """Handle requests to API
+
+        :param str path: API endpoint's path to request
+        :param str method: HTTP method to use
+        :param dict data: Data to send (optional)
+        :param int priority: Scheduling priority, defaults to
+                             :func:`~powerdns.scheduler.current_priority`
+        :param bool decode: Parse the response, its body is returned as
+                            :class:`bytes` otherwise
+        :return: Parsed json response as :class:`dict`
+
+        Additional named argument may be passed and are directly transmitted
+        to :meth:`request` method of :class:`aiohttp.ClientSession` object.
+
+        Failed requests are retried according to :attr:`retry`, a slot of
+        the concurrency limit is not held while waiting to retry.
+
+        :raise PDNSError: If request's response is an error.
+        :raise PDNSCircuitOpenError: If the circuit breaker is open.
+        """
+        started = time.perf_counter()
+        url, data = self._prepare_request(path, method, data)
+        serialization_time = time.perf_counter() - started
+        session = self._get_session()
+
+        attempt = 0
+        while True:
+            self._check_circuit(url)
+            info = self._start_attempt(method, url, data, attempt,
+                                       serialization_time)
+            try:
+                result = await self._send(session, url, method, data,
+                                          priority, info, decode, **kwargs)
+            except Exception as error:
+                self._end_attempt(info, error)
+                delay = self._attempt_failed(method, url, attempt, error)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self._end_attempt(info)
+            self._attempt_succeeded()
+            return result
+
+    async def _send(self, session, url, method, data, priority, info=None,
+                    decode=True, **kwargs):
+        """Send request and handle its response, see
+        :meth:`PDNSApiClient._send`"""
+        key = self._coalesce_key(method, url, data, kwargs)
+        if key is None:
+            raw, network_time = await self._fetch(session, url, method, data,
+                                                  priority, **kwargs)
+            return self._decode(raw, info, network_time, decode=decode)
+        started = time.perf_counter()
+        (raw, network_time), shared = await self.single_flight.do_async(
+            key, partial(self._fetch, session, url, method, data, priority))
+        if shared:
+            network_time = time.perf_counter() - started
+        return self._decode(raw, info, network_time, shared, decode)
+
+    async def _fetch(self, session, url, method, data, priority, **kwargs):
+        """Send request when scheduled and a concurrency slot is free
+
+        :return: Url, status code, body and headers, and network time
+        """
+        if self.scheduler is not None:
+            await self.scheduler.acquire_async(method,
+                                               self._schedule_path(url),
+                                               priority)
+        try:
+            if self._semaphore is None:
+                return await self._read(session, url, method, data, **kwargs)
+            async with self._semaphore:
+                return await self._read(session, url, method, data, **kwargs)
+        finally:
+            if self.scheduler is not None:
+                await self.scheduler.release_async()
+
+    async def _read(self, session, url, method, data, **kwargs):
+        started = time.perf_counter()
+        async with session.request(method, url,
+                                   data=data,
+                                   headers=self.request_headers,
+                                   **kwargs) as response:
+            raw = (str(response.url), response.status, await response.read(),
+                   response.headers)
+        return raw, time.perf_counter() - started
+
+    async def request_stream(self, path, method='GET', data=None,
+                             chunk_size=65536, **kwargs):
+        """Handle requests to API whose response is read by chunks
+
+        :param str path: API endpoint's path to request
+        :param str method: HTTP method to use
+        :param dict data: Data to send (optional)
+        :param int chunk_size: Size of read chunks in bytes
+        :return: Asynchronous generator of response body chunks as
+                 :class:`bytes`
+
+        :raise PDNSError: If request's response is an error.
+        """
+        started = time.perf_counter()
+        url, data = self._prepare_request(path, method, data)
+        serialization_time = time.perf_counter() - started
+        self._check_circuit(url)
+        info = self._start_attempt(method, url, data, 0, serialization_time)
+
+        scheduled = False
+        acquired = False
+        succeeded = False
+        error = None
+        started = time.perf_counter()
+        try:
+            session = self._get_session()
+            if self.scheduler is not None:
+                await self.scheduler.acquire_async(method,
+                                                   self._schedule_path(url))
+                scheduled = True
+            if self._semaphore is not None:
+                await self._semaphore.acquire()
+                acquired = True
+            async with session.request(method, url,
+                                       data=data,
+                                       headers=self.request_headers,
+                                       **kwargs) as response:
+                if info is not None:
+                    info.status = response.status
+                if response.status not in [200, 201]:
+                    self._handle_response(str(response.url), response.status,
+                                          await response.text(),
+                                          response.headers)
+                    return
+                LOG.info("request response code: %d (streamed)",
+                         response.status)
+                self._attempt_succeeded()
+                succeeded = True
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    if info is not None:
+                        info.bytes_received += len(chunk)
+                    yield chunk
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            if acquired:
+                self._semaphore.release()
+            if scheduled:
+                await self.scheduler.release_async()
+            if info is not None:
+                info.network_time = time.perf_counter() - started
+            self._end_stream(info, error, succeeded)
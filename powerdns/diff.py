@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+powerdns.diff - Rrset diff engine
+"""
+
+from datetime import timedelta
+
+#: Record types never deleted when missing from a desired state
+PROTECTED_TYPES = ("SOA", "NS")
+
+
+def rrset_key(rrset):
+    """Get the identity of an rrset
+
+    :param RRSet rrset: Rrset
+    :return: ``(name, rtype)`` as :class:`tuple`
+    """
+    return rrset.get("name"), rrset.get("rtype")
+
+
+def rrset_content(rrset):
+    """Get the comparable content of an rrset
+
+    Records order and duplicates are not significant.
+
+    :param RRSet rrset: Rrset
+    :return: ``(ttl, records)`` as :class:`tuple`
+    """
+    ttl = rrset.get("ttl")
+    if isinstance(ttl, timedelta):
+        ttl = int(ttl.total_seconds())
+    return ttl, frozenset(rrset.get_record_tuples())
+
+
+class RRSetChange(object):
+    """Single change of a :class:`ChangePlan`
+
+    :param str changetype: API keyword DELETE or REPLACE
+    :param RRSet rrset: Rrset to send to the API
+    :param RRSet current: Rrset currently in the zone, if any
+    """
+    __slots__ = ("changetype", "rrset", "current")
+
+    def __init__(self, changetype, rrset, current=None):
+        """Initialization"""
+        self.changetype = changetype
+        self.rrset = rrset
+        self.current = current
+
+    def __repr__(self):
+        return "RRSetChange(%s, %s, %s)" % ((self.changetype,)
+                                            + rrset_key(self.rrset))
+
+
+class ChangePlan(object):
+    """Minimal set of rrset changes between two states of a zone
+
+    :param PDNSZone zone: Zone the plan applies to
+    """
+    def __init__(self, zone=None):
+        """Initialization"""
+        self.zone = zone
+        #: Changes as list of :class:`RRSetChange`
+        self.changes = []
+        #: Number of rrsets identical in both states
+        self.unchanged = 0
+
+    def __repr__(self):
+        return "ChangePlan(replace=%d, delete=%d, unchanged=%d)" % (
+            len(self.replaces), len(self.deletes), self.unchanged)
+
+    def __len__(self):
+        return len(self.changes)
+
+    def __iter__(self):
+        return iter(self.changes)
+
+    @property
+    def replaces(self):
+        """REPLACE changes as list of :class:`RRSetChange`"""
+        return [change for change in self.changes
+                if change.changetype == "REPLACE"]
+
+    @property
+    def deletes(self):
+        """DELETE changes as list of :class:`RRSetChange`"""
+        return [change for change in self.changes
+                if change.changetype == "DELETE"]
+
+    def rrsets(self):
+        """Get rrsets to send, with their changetype set
+
+        Replacing rrsets become rrsets of the plan zone first, so a desired
+        rrset taken from another zone never shows as changed there.
+
+        :return: List of :class:`RRSet`
+        """
+        rrsets = []
+        for change in self.changes:
+            rrset = change.rrset
+            if self.zone is None:
+                rrset._changetype = change.changetype
+            else:
+                if change.changetype == "REPLACE":
+                    rrset._parent = self.zone
+                rrset.set("changetype", change.changetype)
+            rrsets.append(rrset)
+        return rrsets
+
+    def apply(self, **kwargs):
+        """Send the planned changes to the API
+
+        Unchanged rrsets are not sent. Named arguments are transmitted to
+        :meth:`~powerdns.models.zone.PDNSZone.apply_changes` to control
+        batching.
+
+        :return: Number of PATCH batches
+        """
+        if self.zone is None:
+            raise LookupError("This plan is not 'connected' to a Zone")
+        return self.zone.apply_changes(self.rrsets(), **kwargs)
+
+
+def diff_rrsets(current, desired, zone=None, protected=PROTECTED_TYPES):
+    """Compute the changes turning current rrsets into desired ones
+
+    Rrsets are matched by ``(name, rtype)`` and compared by TTL and
+    records, in linear time. Desired rrsets which differ or are missing are
+    replaced, current rrsets missing from the desired state are deleted
+    unless their type is protected.
+
+    :param list current: Current rrsets as list of :class:`RRSet`
+    :param list desired: Desired rrsets as list of :class:`RRSet`
+    :param PDNSZone zone: Zone the plan applies to
+    :param tuple protected: Record types never deleted
+    :return: Changes as :class:`ChangePlan`
+    """
+    plan = ChangePlan(zone)
+    current_by_key = {rrset_key(rrset): rrset for rrset in current}
+    desired_by_key = {rrset_key(rrset): rrset for rrset in desired}
+
+    for key, rrset in desired_by_key.items():
+        existing = current_by_key.get(key)
+        if existing is not None and \
+                rrset_content(existing) == rrset_content(rrset):
+            plan.unchanged += 1
+        else:
+            plan.changes.append(RRSetChange("REPLACE", rrset, existing))
+
+    for key, rrset in current_by_key.items():
+        if key not in desired_by_key and rrset.get("rtype") not in protected:
+            plan.changes.append(RRSetChange("DELETE", rrset, rrset))
+
+    return plan
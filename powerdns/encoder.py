@@ -1,16 +1,149 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+powerdns.encoder - JSON serialization of API payloads
+"""
+
 import json
 from powerdns.models.rrset import RRSet
 from datetime import timedelta
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def encode_ttl(ttl):
+    """Get TTL as seconds
+
+    :param ttl: TTL as :class:`int` or :class:`~datetime.timedelta`
+    :return: TTL as :class:`int`
+    """
+    if isinstance(ttl, timedelta):
+        return int(ttl.total_seconds())
+    return ttl
+
+
+def encode_rrset(rrset):
+    """Get the API representation of an rrset
+
+    Fields are read directly from the rrset slots, other fields such as
+    ``comments`` are sent as set, like :meth:`RRSet.json` returns them.
+
+    :param RRSet rrset: Rrset to encode
+    :return: Rrset as :class:`dict`
+    """
+    ttl = rrset._ttl
+    data = {
+        "name": rrset._name,
+        "type": rrset._rtype,
+        "ttl": ttl if ttl.__class__ is int else encode_ttl(ttl),
+        "changetype": rrset._changetype,
+        "records": rrset.get_records(),
+    }
+    if rrset._extra:
+        data.update(rrset._extra)
+    return data
+
+
+def _default(obj):
+    """Encode values unknown to JSON libraries"""
+    if isinstance(obj, RRSet):
+        return encode_rrset(obj)
+    elif isinstance(obj, timedelta):
+        return int(obj.total_seconds())
+    raise TypeError("Object of type %s is not JSON serializable"
+                    % obj.__class__.__name__)
+
 
 class PDNSJsonEncoder(json.JSONEncoder):
+    """JSON encoder aware of :class:`RRSet` and timedelta values"""
 
     def default(self, obj):
-        print(obj)
-        if isinstance(obj, RRSet):
-            return obj.json()
-        elif isinstance(obj, timedelta):
-            return int(obj.total_seconds())
-        else:
-            return obj
+        try:
+            return _default(obj)
+        except TypeError:
+            return super(PDNSJsonEncoder, self).default(obj)
+
+
+class JSONSerializer(object):
+    """Serializer backend using the :mod:`json` standard library
+
+    Rrsets are written through :func:`encode_rrset` as the C encoder meets
+    them, so a payload of many rrsets never holds more than one
+    intermediate dict at a time.
+    """
+    #: Backend name, see :func:`get_serializer`
+    name = "json"
+
+    def dumps(self, data):
+        """Serialize data
+
+        :param data: Data to serialize
+        :return: JSON document as :class:`str` or :class:`bytes`
+        """
+        return json.dumps(data, default=_default)
+
+    def loads(self, text):
+        """Deserialize a JSON document
+
+        :param text: JSON document as :class:`str` or :class:`bytes`
+        :return: Decoded data
+        """
+        return json.loads(text)
+
+
+class OrjsonSerializer(JSONSerializer):
+    """Serializer backend using :mod:`orjson`, which must be installed"""
+    name = "orjson"
+
+    def __init__(self):
+        """Initialization"""
+        if orjson is None:
+            raise ImportError("OrjsonSerializer requires orjson")
+
+    def dumps(self, data):
+        return orjson.dumps(data, default=_default)
+
+    def loads(self, text):
+        return orjson.loads(text)
+
+
+#: Serializer backends by name
+SERIALIZERS = {
+    JSONSerializer.name: JSONSerializer,
+    OrjsonSerializer.name: OrjsonSerializer,
+}
+
+
+def get_serializer(serializer=None):
+    """Get a serializer backend
 
+    :param serializer: Backend name, backend instance, or :obj:`None` to use
+                       the fastest installed backend
+    :return: Serializer instance
+    """
+    if serializer is None:
+        serializer = "orjson" if orjson is not None else "json"
+    if isinstance(serializer, str):
+        try:
+            return SERIALIZERS[serializer]()
+        except KeyError:
+            raise ValueError("Unknown serializer '%s'" % serializer)
+    return serializer
@@ -32,6 +32,15 @@ class PDNSCanonicalError(SyntaxError):
         super(PDNSCanonicalError, self).__init__()
 
 
+class PDNSZoneFileError(SyntaxError):
+    """PowerDNS Zone File Error, raised on invalid master file content
+    """
+    def __init__(self, message, filename=None, lineno=None, line=None):
+        """Initialization"""
+        self.message = message
+        super(PDNSZoneFileError, self).__init__(message, (filename, lineno, None, line))
+
+
 class PDNSError(Exception):
     """PowerDNS API Exception
     """
@@ -43,9 +52,49 @@ class PDNSError(Exception):
                                                   self.status_code,
                                                   self.message)
 
-    def __init__(self, url, status_code, message):
+    def __init__(self, url, status_code, message, retry_after=None):
         """Initialization"""
         self.url = url
         self.status_code = status_code
         self.message = message
+        #: Delay in seconds requested by a ``Retry-After`` header, if any
+        self.retry_after = retry_after
         super(PDNSError, self).__init__()
+
+
+class PDNSBatchError(PDNSError):
+    """PowerDNS API Exception raised when a batch of rrset changes failed
+
+    Batches before :attr:`batch_index` have been applied. Pass
+    :attr:`resume_from` to
+    :meth:`~powerdns.models.zone.PDNSZone.apply_changes` to resume.
+    """
+    def __str__(self):
+        return "batch %d/%d %s" % (self.batch_index + 1, self.batch_count,
+                                   super(PDNSBatchError, self).__str__())
+
+    def __init__(self, url, status_code, message, batch_index, batch_count,
+                 rrsets, error=None):
+        """Initialization"""
+        self.batch_index = batch_index
+        self.batch_count = batch_count
+        self.rrsets = rrsets
+        self.error = error
+        super(PDNSBatchError, self).__init__(url, status_code, message)
+
+    @property
+    def resume_from(self):
+        """Index of the batch to resume from"""
+        return self.batch_index
+
+
+class PDNSCircuitOpenError(PDNSError):
+    """PowerDNS API Exception raised without sending the request because
+    the API endpoint circuit breaker is open
+
+    :attr:`retry_after` tells when a request will be let through again.
+    """
+    def __init__(self, url, retry_after):
+        """Initialization"""
+        super(PDNSCircuitOpenError, self).__init__(
+            url, 0, "circuit open, API considered down", retry_after)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+powerdns.fanout - Concurrent operations over servers and zones
+"""
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from powerdns.interface import LOG
+
+
+class FanOutResult(object):
+    """Outcome of an operation on one item
+
+    :param item: Item the operation ran on
+    :param value: Value returned by the operation
+    :param Exception error: Exception raised by the operation
+    """
+    __slots__ = ("item", "value", "error")
+
+    def __init__(self, item, value=None, error=None):
+        """Initialization"""
+        self.item = item
+        self.value = value
+        self.error = error
+
+    def __repr__(self):
+        if self.error is not None:
+            return "FanOutResult(%s, error=%r)" % (self.item, self.error)
+        return "FanOutResult(%s, %r)" % (self.item, self.value)
+
+    @property
+    def ok(self):
+        """:obj:`True` if the operation succeeded"""
+        return self.error is None
+
+    def result(self):
+        """Get the value, or raise the error of the operation"""
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+def _failed(item, error):
+    LOG.error("fan-out operation on %s failed: %s", item, error)
+    return FanOutResult(item, error=error)
+
+
+def fan_out(func, items, max_workers=8):
+    """Run a function on every item with a thread pool
+
+    Errors do not stop the other operations, they are collected.
+
+    :param callable func: Function called with each item
+    :param iterable items: Items
+    :param int max_workers: Maximum number of concurrent calls
+    :return: List of :class:`FanOutResult`, in the order of *items*
+    """
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        futures = None
+    else:
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(items)))
+        with executor:
+            # Threads get a copy of the caller context, for request priority
+            futures = [executor.submit(contextvars.copy_context().run, func, item)
+                       for item in items]
+    results = []
+    for index, item in enumerate(items):
+        try:
+            value = func(item) if futures is None else futures[index].result()
+        except Exception as error:
+            results.append(_failed(item, error))
+        else:
+            results.append(FanOutResult(item, value))
+    return results
+
+
+async def fan_out_async(func, items, limit=None):
+    """Await a coroutine function on every item concurrently
+
+    Errors do not stop the other operations, they are collected.
+
+    :param callable func: Coroutine function called with each item
+    :param iterable items: Items
+    :param int limit: Maximum number of concurrent calls, no limit if
+                      :obj:`None`
+    :return: List of :class:`FanOutResult`, in the order of *items*
+    """
+    items = list(items)
+    semaphore = asyncio.Semaphore(limit) if limit else None
+
+    async def run(item):
+        try:
+            if semaphore is None:
+                return FanOutResult(item, await func(item))
+            async with semaphore:
+                return FanOutResult(item, await func(item))
+        except Exception as error:
+            return _failed(item, error)
+
+    return list(await asyncio.gather(*[run(item) for item in items]))
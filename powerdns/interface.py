@@ -28,8 +28,8 @@ LOG = logging.getLogger(__name__)
 class PDNSEndpointBase:
 
     def __init__(self, parent):
+        self._parent = parent
         if parent:
-            self._parent = parent
             api_client = self.get_api_client()
             self.patch_methods(api_client)
 
@@ -47,3 +47,10 @@ class PDNSEndpointBase:
                 return self._parent.get_api_client()
             else:
                 return self._parent
+
+    def is_async(self):
+        """Tell whether the API client methods return coroutines
+
+        :return bool: :obj:`True` with an asynchronous API client
+        """
+        return getattr(self.get_api_client(), "is_async", False)
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+powerdns.journal - Write-behind journal of rrset changes
+"""
+
+import json
+import os
+import threading
+
+from powerdns.diff import rrset_key
+from powerdns.interface import LOG
+from powerdns.models.rrset import RRSet
+
+
+class WriteBehindJournal(object):
+    """Buffer rrset changes of a zone and send them later, together
+
+    Changed rrsets stay pending in the zone, so successive edits of the
+    same ``(name, type)`` collapse into its final state. Pending changes
+    are sent in one PATCH (or :attr:`PDNSZone.batch_size` batches) at most
+    *max_delay* seconds after the first one, or as soon as *max_changes*
+    rrsets are pending, from a background thread.
+
+    Flushes never overlap, so changes reach the API in the order they were
+    made. A failed flush keeps its changes pending for the next one, and
+    an edit made while its rrset is being sent stays pending as well. Use
+    :meth:`flush` or :meth:`sync` to wait for changes to be applied, for
+    instance before reading them back.
+
+    With *path*, every change is also appended to a local file before
+    being acknowledged, and changes not flushed before a crash are staged
+    again when the journal is next opened on the same file.
+
+    :param PDNSZone zone: Zone, with a synchronous API client
+    :param float max_delay: Maximum seconds a change stays buffered
+    :param int max_changes: Number of pending rrsets triggering a flush
+    :param str path: Journal file, optional
+    :param bool fsync: Sync the journal file to disk on every change
+
+    Usually created by :meth:`PDNSZone.enable_write_behind`, the journal
+    becomes the one of *zone*.
+    """
+    def __init__(self, zone, max_delay=1.0, max_changes=100, path=None,
+                 fsync=False):
+        """Initialization"""
+        if zone.is_async():
+            raise RuntimeError("Write-behind requires a synchronous API client")
+        self.zone = zone
+        self.max_delay = max_delay
+        self.max_changes = max_changes
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._versions = {}
+        self._sequence = 0
+        self._timer = None
+        self._file = None
+        self._closed = False
+        #: Last error of a background flush, :obj:`None` once one succeeds
+        self.last_error = None
+        #: Changes recorded, flushes done and rrsets sent
+        self.stats = {
+            "changes": 0,
+            "flushes": 0,
+            "rrsets_sent": 0,
+        }
+        zone.journal = self
+        if path is not None:
+            self._recover()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self.zone._dirty_rrsets)
+
+    @property
+    def pending(self):
+        """Number of rrsets waiting to be sent"""
+        return len(self.zone._dirty_rrsets)
+
+    def record(self, rrset):
+        """Stage a changed rrset in the zone, called by the zone
+
+        The rrset becomes pending and its version changes at once, so a
+        flush running meanwhile never takes it as sent.
+
+        :param RRSet rrset: Changed rrset of the zone
+        """
+        key = rrset_key(rrset)
+        with self._lock:
+            self.zone._dirty_rrsets[key] = rrset
+            self._sequence += 1
+            self._versions[key] = self._sequence
+            self.stats["changes"] += 1
+            if self._file is not None:
+                self._write({"seq": self._sequence, "rrset": list(rrset.to_tuple()),
+                             "changetype": rrset.get("changetype")})
+            if self.pending >= self.max_changes:
+                self._arm(0)
+            elif self._timer is None:
+                self._arm(self.max_delay)
+
+    def flush(self):
+        """Send pending changes now and wait for them to be applied
+
+        :return: Number of rrsets sent
+        :raise PDNSError: If the API refused the changes, they stay pending
+        """
+        with self._flush_lock:
+            with self._lock:
+                self._disarm()
+                pending = dict(self.zone._dirty_rrsets)
+                versions = {key: self._versions.get(key, 0) for key in pending}
+                sequence = self._sequence
+                rrsets = [rrset.copy() for rrset in pending.values()]
+            if not rrsets:
+                return 0
+            try:
+                batches = self.zone.split_batches(rrsets, self.zone.batch_size,
+                                                  self.zone.max_batch_bytes)
+                for batch in batches:
+                    self.zone._patch(self.zone._get_save_url(), data={"rrsets": batch})
+            except Exception:
+                with self._lock:
+                    self._arm(self.max_delay)
+                raise
+            with self._lock:
+                applied = []
+                for key, rrset in pending.items():
+                    # Edited again while being sent, keep it for next flush
+                    if self._versions.get(key, 0) == versions[key] and \
+                            self.zone._dirty_rrsets.get(key) is rrset:
+                        del self.zone._dirty_rrsets[key]
+                        self._versions.pop(key, None)
+                        applied.append(rrset)
+                self.zone._account({}, rrsets, len(batches))
+                self.zone._drop_deleted_rrsets(applied)
+                self.zone._notify(rrsets)
+                self.stats["flushes"] += 1
+                self.stats["rrsets_sent"] += len(rrsets)
+                if self._file is not None:
+                    self._checkpoint(sequence)
+                if self.pending:
+                    self._arm(self.max_delay)
+            LOG.debug("journal of zone %s flushed %d rrsets",
+                      self.zone.get("name"), len(rrsets))
+            return len(rrsets)
+
+    def sync(self):
+        """Flush until no change is pending, including those made meanwhile
+
+        :return: Number of rrsets sent
+        """
+        sent = 0
+        while self.pending:
+            sent += self.flush()
+        return sent
+
+    def close(self):
+        """Flush pending changes and stop the background flushes"""
+        try:
+            self.sync()
+        finally:
+            with self._lock:
+                self._closed = True
+                self._disarm()
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+            if self.zone.journal is self:
+                self.zone.journal = None
+
+    def _arm(self, delay):
+        if self._closed:
+            return
+        self._disarm()
+        self._timer = threading.Timer(delay, self._background_flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _disarm(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _background_flush(self):
+        try:
+            self.flush()
+            self.last_error = None
+        except Exception as error:
+            self.last_error = error
+            LOG.error("journal of zone %s failed to flush: %s",
+                      self.zone.get("name"), error)
+
+    def _write(self, entry):
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _checkpoint(self, sequence):
+        """Mark changes up to *sequence* as applied, compact if possible"""
+        if self.pending:
+            self._write({"flushed": sequence})
+            return
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.flush()
+
+    def _recover(self):
+        """Stage changes left in the journal file by a previous process"""
+        entries = []
+        if os.path.exists(self.path):
+            with open(self.path) as journal:
+                for line in journal:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        LOG.warning("ignoring truncated journal entry in %s", self.path)
+                        continue
+                    if "flushed" in entry:
+                        entries = [kept for kept in entries
+                                   if kept["seq"] > entry["flushed"]]
+                    else:
+                        entries.append(entry)
+        if entries:
+            LOG.info("staging %d changes from journal %s", len(entries), self.path)
+        # Staged changes are written to a new journal replacing the old one
+        # at once, a crash meanwhile leaves the old one to recover from
+        temporary = self.path + ".tmp"
+        with self._lock:
+            self._file = open(temporary, "w")
+            for entry in entries:
+                rrset = RRSet.from_tuple(None, tuple(entry["rrset"]))
+                rrset._records = tuple(tuple(record) for record in rrset._records or ())
+                rrset.set("changetype", entry["changetype"])
+                self.zone.append_rrset(rrset)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            os.replace(temporary, self.path)
+            self._file = open(self.path, "a")
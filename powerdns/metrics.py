@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+powerdns.metrics - Request instrumentation hooks and collectors
+"""
+
+import bisect
+import re
+import threading
+import time
+from collections import deque
+
+from powerdns.interface import LOG
+
+try:
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:
+    SpanKind = Status = StatusCode = None
+
+#: Upper bounds of latency histogram buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_TEMPLATE_RULES = [
+    (re.compile(r"^/servers/[^/]+"), "/servers/{server_id}"),
+    (re.compile(r"/zones/[^/]+"), "/zones/{zone_id}"),
+    (re.compile(r"/metadata/[^/]+"), "/metadata/{kind}"),
+    (re.compile(r"/cryptokeys/[^/]+"), "/cryptokeys/{cryptokey_id}"),
+    (re.compile(r"/tsigkeys/[^/]+"), "/tsigkeys/{tsigkey_id}"),
+]
+
+
+def path_template(path):
+    """Get the route of a request path, without server and zone ids
+
+    ``/servers/localhost/zones/example.com.`` becomes
+    ``/servers/{server_id}/zones/{zone_id}``, so metrics are not split by
+    zone.
+
+    :param str path: Request path, relative to the API endpoint
+    :return: Path template as :class:`str`
+    """
+    path = path.split("?", 1)[0]
+    for pattern, replacement in _TEMPLATE_RULES:
+        path = pattern.sub(replacement, path, count=1)
+    return path
+
+
+class RequestInfo(object):
+    """Measures of a request attempt given to hooks
+
+    Retried requests give one instance per attempt.
+    """
+    __slots__ = ("method", "url", "path", "attempt", "status", "error",
+                 "bytes_sent", "bytes_received", "serialization_time",
+                 "network_time", "shared", "started", "duration", "context",
+                 "_perf_started")
+
+    def __init__(self, method, url, path, attempt=0, bytes_sent=0,
+                 serialization_time=0.0):
+        """Initialization"""
+        #: HTTP method
+        self.method = method
+        #: Requested url
+        self.url = url
+        #: Path template, see :func:`path_template`
+        self.path = path
+        #: Attempt number, from 0
+        self.attempt = attempt
+        #: Response status code, :obj:`None` if no response was received
+        self.status = None
+        #: Exception raised by the attempt, if any
+        self.error = None
+        #: Request body size in bytes
+        self.bytes_sent = bytes_sent
+        #: Response body size in bytes
+        self.bytes_received = 0
+        #: Seconds spent encoding the request and decoding the response
+        self.serialization_time = serialization_time
+        #: Seconds between sending the request and receiving the body
+        self.network_time = 0.0
+        #: Response obtained by a concurrent identical request
+        self.shared = False
+        #: Wall clock start time
+        self.started = time.time()
+        #: Seconds between hooks, including scheduling waits
+        self.duration = 0.0
+        #: Free storage for hooks, such as spans
+        self.context = {}
+        self._perf_started = time.perf_counter()
+
+    def __repr__(self):
+        return "RequestInfo(%s %s, status=%s)" % (self.method, self.path,
+                                                   self.status)
+
+    def finish(self, error=None):
+        """Record the end of the attempt"""
+        self.duration = time.perf_counter() - self._perf_started
+        self.error = error
+        if error is not None and self.status is None:
+            self.status = getattr(error, "status_code", None) or None
+
+
+class RequestHook(object):
+    """Base of request hooks
+
+    Hooks are given to API clients with ``hooks=[...]`` or
+    :meth:`~powerdns.client.PDNSApiClientBase.add_hook`. Exceptions raised
+    by hooks are logged and never fail requests.
+    """
+    def before_request(self, info):
+        """Called before a request attempt
+
+        :param RequestInfo info: Request measures, partially filled
+        """
+
+    def after_request(self, info):
+        """Called after a request attempt, successful or not
+
+        :param RequestInfo info: Request measures
+        """
+
+
+class Histogram(object):
+    """Cumulative histogram
+
+    :param tuple buckets: Sorted bucket upper bounds
+    """
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Initialization"""
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Record a value"""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolation inside its bucket
+
+        :param float q: Quantile, between 0 and 1
+        :return: Estimated value as :class:`float`
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[index - 1] if index else 0.0
+                if index == len(self.buckets):
+                    return lower
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class MetricsCollector(RequestHook):
+    """Latency histograms and traffic counters per method, route and status
+
+    Example::
+
+        metrics = MetricsCollector()
+        api_client = PDNSApiClient(api_endpoint, api_key, hooks=[metrics])
+        ...
+        print(metrics.to_prometheus())
+
+    :param tuple buckets: Latency histogram bucket upper bounds
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Initialization"""
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def after_request(self, info):
+        key = (info.method, info.path, str(info.status or "error"))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    "duration": Histogram(self.buckets),
+                    "network": Histogram(self.buckets),
+                    "serialization_seconds": 0.0,
+                    "bytes_sent": 0,
+                    "bytes_received": 0,
+                }
+            series["duration"].observe(info.duration)
+            series["network"].observe(info.network_time)
+            series["serialization_seconds"] += info.serialization_time
+            series["bytes_sent"] += info.bytes_sent
+            series["bytes_received"] += info.bytes_received
+
+    def series(self):
+        """Get collected series
+
+        :return: ``{(method, path, status): series}`` as :class:`dict`,
+                 series holding ``duration`` and ``network``
+                 :class:`Histogram` and byte and serialization counters
+        """
+        with self._lock:
+            return dict(self._series)
+
+    def reset(self):
+        """Forget collected series"""
+        with self._lock:
+            self._series = {}
+
+    def to_prometheus(self, prefix="powerdns_api"):
+        """Export collected series in Prometheus text format
+
+        :param str prefix: Metric name prefix
+        :return: Exposition text as :class:`str`
+        """
+        lines = []
+        series = sorted(self.series().items())
+        for name, help_text in (("request_duration_seconds", "Request duration"),
+                                ("network_seconds", "Time waiting for the API")):
+            metric = "%s_%s" % (prefix, name)
+            lines.append("# HELP %s %s" % (metric, help_text))
+            lines.append("# TYPE %s histogram" % metric)
+            field = "duration" if name.startswith("request") else "network"
+            for key, values in series:
+                labels = _labels(key)
+                histogram = values[field]
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append('%s_bucket{%s,le="%s"} %d' % (metric, labels, bound,
+                                                               cumulative))
+                lines.append("%s_sum{%s} %.6f" % (metric, labels, histogram.sum))
+                lines.append("%s_count{%s} %d" % (metric, labels, histogram.count))
+        for name, field, help_text in (
+                ("serialization_seconds_total", "serialization_seconds",
+                 "Time spent encoding and decoding JSON"),
+                ("sent_bytes_total", "bytes_sent", "Request body bytes"),
+                ("received_bytes_total", "bytes_received", "Response body bytes")):
+            metric = "%s_%s" % (prefix, name)
+            lines.append("# HELP %s %s" % (metric, help_text))
+            lines.append("# TYPE %s counter" % metric)
+            for key, values in series:
+                lines.append("%s{%s} %s" % (metric, _labels(key), values[field]))
+        return "\n".join(lines) + "\n"
+
+
+def _labels(key):
+    method, path, status = key
+    return 'method="%s",path="%s",status="%s"' % (method, path.replace('"', '\\"'),
+                                                  status)
+
+
+class TracingHook(RequestHook):
+    """OpenTelemetry-style client spans of requests
+
+    With an OpenTelemetry tracer, a real span is created for each attempt.
+    Without one, spans are kept as dictionaries in :attr:`spans`, the
+    *max_spans* most recent ones. Attributes follow the OpenTelemetry HTTP
+    semantic conventions.
+
+    :param tracer: :class:`opentelemetry.trace.Tracer`, optional
+    :param int max_spans: Number of recorded spans kept without tracer
+    """
+    def __init__(self, tracer=None, max_spans=1000):
+        """Initialization"""
+        self.tracer = tracer
+        #: Recorded spans when no tracer is given
+        self.spans = deque(maxlen=max_spans)
+
+    @staticmethod
+    def _attributes(info):
+        attributes = {
+            "http.request.method": info.method,
+            "http.route": info.path,
+            "url.full": info.url,
+            "http.request.body.size": info.bytes_sent,
+        }
+        if info.attempt:
+            attributes["http.request.resend_count"] = info.attempt
+        return attributes
+
+    def before_request(self, info):
+        if self.tracer is not None:
+            info.context["span"] = self.tracer.start_span(
+                "%s %s" % (info.method, info.path),
+                kind=SpanKind.CLIENT,
+                attributes=self._attributes(info))
+
+    def after_request(self, info):
+        attributes = {
+            "http.response.body.size": info.bytes_received,
+            "powerdns.serialization_time": info.serialization_time,
+            "powerdns.network_time": info.network_time,
+        }
+        if info.status is not None:
+            attributes["http.response.status_code"] = info.status
+        if info.shared:
+            attributes["powerdns.coalesced"] = True
+        if info.error is not None:
+            attributes["error.type"] = type(info.error).__name__
+        span = info.context.get("span")
+        if span is None:
+            attributes.update(self._attributes(info))
+            self.spans.append({
+                "name": "%s %s" % (info.method, info.path),
+                "kind": "CLIENT",
+                "start_time": info.started,
+                "end_time": info.started + info.duration,
+                "status": "ERROR" if info.error is not None else "OK",
+                "attributes": attributes,
+            })
+            return
+        span.set_attributes(attributes)
+        if info.error is not None and Status is not None:
+            span.set_status(Status(StatusCode.ERROR, str(info.error)))
+        span.end()
+
+
+def run_hooks(hooks, stage, info):
+    """Call a stage of every hook, logging their errors"""
+    for hook in hooks:
+        try:
+            getattr(hook, stage)(info)
+        except Exception:
+            LOG.exception("request hook %r failed", hook)
@@ -1,13 +1,29 @@
+from powerdns.bulk import BulkLoader
+from powerdns.fanout import fan_out, fan_out_async
 from powerdns.interface import PDNSEndpointBase, LOG
 from powerdns.models.server import PDNSServer
 
 
 class PDNSEndpoint(PDNSEndpointBase):
 
-    def __init__(self, api_client):
-        """Initialization method"""
+    def __init__(self, api_client, zone_cache=None, max_workers=8):
+        """Initialization method
+
+        :param api_client: :class:`~powerdns.PDNSApiClient` instance
+        :param zone_cache: :class:`~powerdns.cache.ZoneCache` shared by
+                           servers, optional
+        :param int max_workers: Default number of concurrent operations of
+                                fan-out methods, should not exceed the
+                                client connection pool size
+        """
         super(PDNSEndpoint, self).__init__(api_client)
-        self._server_list = self._load_server_list()
+        self.zone_cache = zone_cache
+        self.max_workers = max_workers
+        self._server_list = []
+        #: Server index as ``{id: PDNSServer}``
+        self._server_index = {}
+        if not self.is_async():
+            self._server_list = self._load_server_list()
 
     def __repr__(self):
         return 'PDNSEndpoint(%s)' % self.get_api_client()
@@ -23,7 +39,29 @@ class PDNSEndpoint(PDNSEndpointBase):
             Requests the PDNS Admin API and return a Server List
             :return PDNSServer List: list of all PDNSServers on this endpoint
         """
-        return [PDNSServer.parse(self, data) for data in self._get('/servers')]
+        servers = [PDNSServer.parse(self, data) for data in self._get('/servers')]
+        self._server_index = {server.get("id"): server for server in servers}
+        return servers
+
+    async def load_servers_async(self):
+        """
+            Asynchronously requests the PDNS Admin API for the Server List
+            :return PDNSServer List: list of all PDNSServers on this endpoint
+        """
+        self._server_list = [PDNSServer.parse(self, data)
+                             for data in await self._get('/servers')]
+        self._server_index = {server.get("id"): server
+                              for server in self._server_list}
+        return self._server_list
+
+    def prefetch(self):
+        """
+            Load zone lists, zone details and rrsets of every server
+            :return PDNSServer List: list of all PDNSServers on this endpoint
+        """
+        for server in self._server_list:
+            server.prefetch()
+        return self._server_list
 
     def get_server(self, id):
         """
@@ -31,6 +69,124 @@ class PDNSEndpoint(PDNSEndpointBase):
             :param sid: Id of Server to use
             :return PDNSServer: :class: `PDNSServer` Instance
         """
-        for server in self._server_list:
-            if server.get("id") == id:
-                return server
\ No newline at end of file
+        return self._server_index.get(id)
+
+    @property
+    def servers(self):
+        """Servers of this endpoint"""
+        return self._server_list
+
+    def all_zones(self):
+        """
+            Zones of every server, zone lists are requested if not loaded yet
+            :return PDNSZone List: list of all zones on this endpoint
+        """
+        return [zone for server in self._server_list for zone in server.zones]
+
+    def fan_out(self, func, items=None, max_workers=None):
+        """
+            Run a function concurrently on servers or zones
+
+            Errors are collected, they do not stop the other operations::
+
+                for result in endpoint.fan_out(lambda zone: zone.get("serial"),
+                                               endpoint.all_zones()):
+                    print(result.item, result.value if result.ok else result.error)
+
+            :param callable func: Function called with each item
+            :param iterable items: Items, servers of this endpoint by default
+            :param int max_workers: Maximum number of concurrent calls,
+                                    defaults to :attr:`max_workers`
+            :return: List of :class:`~powerdns.fanout.FanOutResult`, in the
+                     order of *items*
+        """
+        if items is None:
+            items = self._server_list
+        return fan_out(func, items, max_workers or self.max_workers)
+
+    async def fan_out_async(self, func, items=None, limit=None):
+        """
+            Await a coroutine function concurrently on servers or zones
+
+            :param callable func: Coroutine function called with each item
+            :param iterable items: Items, servers of this endpoint by default
+            :param int limit: Maximum number of concurrent calls, defaults
+                              to :attr:`max_workers`
+            :return: List of :class:`~powerdns.fanout.FanOutResult`, in the
+                     order of *items*
+        """
+        if items is None:
+            items = self._server_list
+        return await fan_out_async(func, items, limit or self.max_workers)
+
+    def load_zones(self, max_workers=None):
+        """
+            Request the zone lists of every server concurrently
+            :return: List of :class:`~powerdns.fanout.FanOutResult` holding
+                     the zones of each server
+        """
+        return self.fan_out(lambda server: server._load_zone_list(),
+                            max_workers=max_workers)
+
+    def refresh_zones(self, zones=None, max_workers=None, force=False):
+        """
+            Load details and rrsets of many zones concurrently
+
+            :param list zones: Zones, every zone of this endpoint by default
+            :param int max_workers: Maximum number of concurrent refreshes
+            :param bool force: Ignore the zone cache
+            :return: List of :class:`~powerdns.fanout.FanOutResult`
+        """
+        if zones is None:
+            zones = self.all_zones()
+        return self.fan_out(lambda zone: zone.refresh(force=force), zones,
+                            max_workers)
+
+    def bulk_load_zones(self, zones=None, processes=None, max_workers=None):
+        """
+            Load details and rrsets of many zones, parsed by worker processes
+
+            See :class:`~powerdns.bulk.BulkLoader`, whose pool only lives
+            for this call. Use one directly to load zones several times.
+
+            :param list zones: Zones, every zone of this endpoint by default
+            :param int processes: Number of worker processes, the number of
+                                  CPUs by default
+            :param int max_workers: Maximum number of concurrent requests
+            :return: List of :class:`~powerdns.fanout.FanOutResult`
+        """
+        if zones is None:
+            zones = self.all_zones()
+        with BulkLoader(processes, max_workers or self.max_workers) as loader:
+            return loader.load(zones)
+
+    def save_zones(self, zones=None, max_workers=None):
+        """
+            Save many zones concurrently
+
+            :param list zones: Zones, every zone with pending changes by
+                               default
+            :param int max_workers: Maximum number of concurrent saves
+            :return: List of :class:`~powerdns.fanout.FanOutResult`
+        """
+        if zones is None:
+            zones = [zone for zone in self.all_zones() if zone.has_changes()]
+        return self.fan_out(lambda zone: zone.save(), zones, max_workers)
+
+    async def load_zones_async(self, limit=None):
+        return await self.fan_out_async(
+            lambda server: server.load_zones_async(refresh=False), limit=limit)
+
+    async def refresh_zones_async(self, zones=None, limit=None, force=False):
+        if zones is None:
+            zones = [zone for server in self._server_list
+                     for zone in server.zones]
+        return await self.fan_out_async(
+            lambda zone: zone.refresh_async(force=force), zones, limit)
+
+    async def save_zones_async(self, zones=None, limit=None):
+        if zones is None:
+            zones = [zone for server in self._server_list
+                     for zone in server.zones if zone.has_changes()]
+        return await self.fan_out_async(lambda zone: zone.save_async(),
+                                        zones, limit)
@@ -1,60 +1,167 @@
+import sys
 from powerdns.exceptions import PDNSCanonicalError
 from powerdns.interface import LOG
 from powerdns.interface import PDNSEndpointBase
-import copy
 
 
-class RRSet:
+def _record_tuple(record):
+    """Store a record as ``(content, disabled)``
+
+    :param record: Record as :class:`dict`, :class:`str` or
+                   ``(content, disabled)`` sequence
+    """
+    if isinstance(record, dict):
+        return record["content"], bool(record.get("disabled", False))
+    if isinstance(record, (tuple, list)):
+        return record[0], bool(record[1]) if len(record) > 1 else False
+    return record, False
+
+
+class RRSet(object):
     """Resource record data for PowerDNS API
 
     :param str changetype: API keyword DELETE or REPLACE
     :param str name: Record name
     :param str rtype: Record type
-    :param list records: List of Str or Tuple(content_str, disabled_bool)
+    :param list records: List of Str, Tuple(content_str, disabled_bool) or
+                         API record dict
     :param int ttl: Record time to live
 
+    Rrsets are kept compact since zones may hold millions of them: names
+    and types are interned and records are stored as a tuple of
+    ``(content, disabled)`` tuples. :meth:`get` returns records as API
+    dicts built on the fly, so use :meth:`set` to change them.
+
     .. seealso:: https://doc.powerdns.com/md/httpapi/api_spec/#url-apiv1serversserver95idzoneszone95id
     """
+    __slots__ = ("_parent", "_name", "_rtype", "_ttl", "_changetype",
+                 "_records", "_deleted_records", "_extra")
+
     def __init__(self, zone=None, name=None, rtype=None, records=None, ttl=3600, changetype='REPLACE'):
         self._parent = zone
-        self._details = {
-            "name": name,
-            "rtype": rtype,
-            "records": records,
-            "ttl": ttl,
-            "changetype": changetype
-        }
-        self._deleted_records = []
+        self._name = sys.intern(name) if name is not None else None
+        self._rtype = sys.intern(rtype) if rtype is not None else None
+        self._records = self._pack_records(records)
+        self._ttl = ttl
+        self._changetype = sys.intern(changetype) if changetype is not None else None
+        self._deleted_records = ()
+        #: Details not known by the API representation, rarely used
+        self._extra = None
+
+    @staticmethod
+    def _pack_records(records):
+        if records is None:
+            return None
+        return tuple([_record_tuple(record) for record in records])
+
+    @staticmethod
+    def _unpack_records(records):
+        return [{"content": content, "disabled": disabled}
+                for content, disabled in records]
 
     def json(self):
-        json = copy.copy(self._details)
-        if "rtype" in self._details:
-            json["type"] = json.pop("rtype")
-        json["records"] += self._deleted_records
+        json = {
+            "name": self._name,
+            "type": self._rtype,
+            "records": self.get_records(),
+            "ttl": self._ttl,
+            "changetype": self._changetype,
+        }
+        if self._extra:
+            json.update(self._extra)
         return json
 
+    def get_records(self):
+        """Get records to send to the API, including deleted ones"""
+        if self._records is None and not self._deleted_records:
+            return None
+        return self._unpack_records((self._records or ()) + self._deleted_records)
+
+    def get_record_tuples(self):
+        """Get records as a tuple of ``(content, disabled)`` tuples
+
+        This is the stored representation, no copy is made.
+        """
+        return self._records or ()
+
     def get(self, name):
-        return self._details[name]
+        if name == "name":
+            return self._name
+        elif name == "rtype":
+            return self._rtype
+        elif name == "records":
+            return None if self._records is None else self._unpack_records(self._records)
+        elif name == "ttl":
+            return self._ttl
+        elif name == "changetype":
+            return self._changetype
+        if self._extra is None:
+            raise KeyError(name)
+        return self._extra[name]
 
     def set(self, name, value):
+        from powerdns.models.zone import PDNSZone
         if name == "name" and self.get("name") is not None:
             raise ValueError("You cant change the Name. If you change the name anyway, please Create a new RRSet with the new Informations and delete this one")
-        self._details[name] = value
+        old_value = self._rtype
+        if name == "name":
+            self._name = sys.intern(value) if value is not None else None
+        elif name == "rtype":
+            self._rtype = sys.intern(value) if value is not None else None
+        elif name == "records":
+            self._records = self._pack_records(value)
+        elif name == "ttl":
+            self._ttl = value
+        elif name == "changetype":
+            self._changetype = sys.intern(value) if value is not None else None
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[name] = value
+        if isinstance(self._parent, PDNSZone):
+            if name == "rtype" and old_value != value:
+                self._parent._reindex_rrset(self, old_value)
+            self._parent._mark_dirty(self)
 
     def __str__(self):
         return str(self.json())
-        # records = []
-        #
-        # for rr in self.raw_records:
-        #     if isinstance(rr, tuple) or isinstance(rr, list):
-        #         records += [rr[0]]
-        #     else:
-        #         records += [rr]
-        #
-        # return "(ttl=%d) %s  %s  %s)" % (self['ttl'],
-        #                                  self['name'],
-        #                                  self['type'],
-        #                                  records)
+
+    def to_tuple(self):
+        """Get a compact, picklable copy of this rrset
+
+        :return: ``(name, rtype, ttl, records)`` as :class:`tuple`
+        """
+        return self._name, self._rtype, self._ttl, self._records
+
+    @classmethod
+    def from_tuple(cls, zone, data):
+        """Build an rrset from :meth:`to_tuple` data
+
+        :param PDNSZone zone: Zone of the rrset
+        :param tuple data: ``(name, rtype, ttl, records)``
+        :return: :class:`RRSet`
+        """
+        rrset = cls.__new__(cls)
+        rrset._parent = zone
+        name, rtype, rrset._ttl, rrset._records = data
+        # Tuples may come from another process, whose strings are not shared
+        rrset._name = sys.intern(name) if name is not None else None
+        rrset._rtype = sys.intern(rtype) if rtype is not None else None
+        rrset._changetype = "REPLACE"
+        rrset._deleted_records = ()
+        rrset._extra = None
+        return rrset
+
+    def copy(self):
+        """Get a detached copy of this rrset, as sent to the API
+
+        :return: :class:`RRSet` without zone
+        """
+        rrset = self.from_tuple(None, self.to_tuple())
+        rrset._changetype = self._changetype
+        rrset._deleted_records = self._deleted_records
+        rrset._extra = dict(self._extra) if self._extra else None
+        return rrset
 
     @classmethod
     def parse(cls, zone, raw_data):
@@ -79,23 +186,26 @@ class RRSet:
             This method update :class:`RRSet` data to ensure the use of
             canonical names. It is actually not possible to revert values.
         """
-        LOG.debug("ensuring rrset %s is canonical", self['name'])
+        LOG.debug("ensuring rrset %s is canonical", self._name)
         if not zone.endswith('.'):
             raise PDNSCanonicalError(zone)
-        if not self['name'].endswith('.'):
-            LOG.debug("transforming %s with %s", self['name'], zone)
-            self['name'] += ".%s" % zone
-        if self['rtype'] == 'CNAME':
-            for record in self['records']:
-                if not record['content'].endswith('.'):
-                    LOG.debug("transforming %s with %s",
-                              record['content'], zone)
-                    record['content'] += ".%s" % zone
+        if not self._name.endswith('.'):
+            LOG.debug("transforming %s with %s", self._name, zone)
+            self._name = sys.intern("%s.%s" % (self._name, zone))
+        if self._rtype == 'CNAME':
+            records = []
+            for content, disabled in self.get_record_tuples():
+                if not content.endswith('.'):
+                    LOG.debug("transforming %s with %s", content, zone)
+                    content += ".%s" % zone
+                records.append((content, disabled))
+            self._records = tuple(records)
 
     def mark_as_deleted(self):
         from powerdns.models.zone import PDNSZone
         if isinstance(self._parent, PDNSZone):
             self.set("changetype", "DELETE")
-            self._parent.save()
+            if self._parent.journal is None:
+                self._parent.save()
         else:
-            raise LookupError("This rrset is not 'connected' to a Zone")
\ No newline at end of file
+            raise LookupError("This rrset is not 'connected' to a Zone")
@@ -0,0 +1,85 @@
+from powerdns.models.rrset import RRSet
+
+#: Object types of the search-data endpoint
+SEARCH_OBJECT_TYPES = ("all", "zone", "record", "comment")
+
+
+class SearchResult(object):
+    """Entry of a :meth:`PDNSServer.search` response
+
+    Results only hold what the API returned. Their zone and rrset are
+    materialized on first access: :attr:`zone` costs no request, while
+    :meth:`get_rrset` loads the zone. Results of one search share their
+    zones, so a zone is loaded once whatever the number of its results.
+
+    :param PDNSServer server: Server searched
+    :param dict raw_data: Search-data entry
+    :param dict zones: Zones shared by the results of a search, as
+                       ``{name: PDNSZone}``
+    """
+    __slots__ = ("_server", "_zones", "_zone", "object_type", "name", "rtype", "ttl",
+                 "content", "disabled", "zone_name", "zone_id")
+
+    def __init__(self, server, raw_data, zones=None):
+        """Initialization"""
+        self._server = server
+        self._zones = {} if zones is None else zones
+        self._zone = None
+        #: ``zone``, ``record`` or ``comment``
+        self.object_type = raw_data.get("object_type")
+        #: Zone or record name
+        self.name = raw_data.get("name")
+        #: Record type, :obj:`None` for zones
+        self.rtype = raw_data.get("type")
+        #: Record time to live, :obj:`None` for zones
+        self.ttl = raw_data.get("ttl")
+        #: Record or comment content, :obj:`None` for zones
+        self.content = raw_data.get("content")
+        #: Whether the record is disabled
+        self.disabled = raw_data.get("disabled", False)
+        #: Name of the zone holding the result
+        self.zone_name = raw_data.get("zone") or self.name
+        #: Id of the zone holding the result
+        self.zone_id = raw_data.get("zone_id") or self.zone_name
+
+    def __repr__(self):
+        if self.object_type == "zone":
+            return "SearchResult(zone %s)" % self.name
+        return "SearchResult(%s %s %s %s)" % (self.object_type, self.name,
+                                              self.rtype, self.content)
+
+    @property
+    def zone(self):
+        """
+            Zone holding the result as :class:`PDNSZone`
+
+            The zone of the server zone list is used if already loaded,
+            otherwise a zone loaded on first access is made, once per
+            search.
+        """
+        if self._zone is None:
+            self._zone = self._server._find_zone(self.zone_name, self._zones,
+                                                 id=self.zone_id)
+        return self._zone
+
+    def get_rrset(self):
+        """
+            Get the zone rrset of a record, loading the zone
+
+            :return: :class:`RRSet` or :obj:`None`
+        """
+        if self.rtype is None:
+            return None
+        return self.zone.get_rrset(self.name, self.rtype)
+
+    def to_rrset(self):
+        """
+            Get the record as an rrset of its own, without request
+
+            :return: :class:`RRSet` not attached to a zone, or :obj:`None`
+                     for zones
+        """
+        if self.object_type != "record":
+            return None
+        return RRSet(name=self.name, rtype=self.rtype, ttl=self.ttl,
+                     records=[(self.content, self.disabled)])
@@ -1,21 +1,35 @@
+import asyncio
 import json
+from urllib.parse import urlencode
 
 from powerdns.exceptions import PDNSCanonicalError
 from powerdns.interface import PDNSEndpointBase, LOG
+from powerdns.models.search import SEARCH_OBJECT_TYPES, SearchResult
+from powerdns.models.summary import ZoneSummary
 from powerdns.models.zone import PDNSZone
 
 
 class PDNSServer(PDNSEndpointBase):
 
-    def __init__(self, endpoint=None, id="localhost", version=None, daemon_type=None):
+    def __init__(self, endpoint=None, id="localhost", version=None, daemon_type=None,
+                 zone_cache=None):
         super(PDNSServer, self).__init__(endpoint)
+        #: Shared :class:`~powerdns.cache.ZoneCache`, defaults to the
+        #: endpoint one
+        self.zone_cache = zone_cache or getattr(endpoint, "zone_cache", None)
+        #: :class:`~powerdns.snapshot.SnapshotStore` refreshed zones are
+        #: written to, see :meth:`load_snapshot`
+        self.snapshot_store = None
         self._detail = {
             "id": id,
             "version": version,
             "daemon_type": daemon_type,
         }
 
-        self._zone_list = self._load_zone_list()
+        #: Zone list is loaded on first access, see :attr:`zones`
+        self._zone_list = None
+        #: Zone index as ``{name: PDNSZone}``
+        self._zone_index = {}
 
     def __str__(self):
         return 'PDNSServer:%s' % self.get("id")
@@ -36,14 +50,174 @@ class PDNSServer(PDNSEndpointBase):
     def get_zone_url(self):
         return "/servers/{}/zones".format(self.get("id"))
 
+    def list_zones(self):
+        """
+            List zones without loading them
+
+            A single zone list request is sent. Unlike :attr:`zones`, no
+            :class:`PDNSZone` is built, use :meth:`ZoneSummary.promote` to
+            get one.
+
+            :return list: Zones as :class:`ZoneSummary` instances
+        """
+        return [ZoneSummary(self, data) for data in self._get(self.get_zone_url())]
+
+    async def list_zones_async(self):
+        return [ZoneSummary(self, data) for data in await self._get(self.get_zone_url())]
+
+    def get_search_url(self, query, object_type="all", max_results=100):
+        if object_type not in SEARCH_OBJECT_TYPES:
+            raise ValueError("object_type must be one of %s" % ", ".join(SEARCH_OBJECT_TYPES))
+        return "{}/search-data?{}".format(self.get_url(), urlencode(
+            [("q", query), ("max", max_results), ("object_type", object_type)]))
+
+    def search(self, query, object_type="all", max_results=100):
+        """
+            Search zones, records and comments on the server side
+
+            A single search-data request is sent, when iteration starts,
+            whatever the number of zones. Zones and rrsets of results are
+            only loaded when asked, see :class:`SearchResult`::
+
+                for result in server.search("192.0.2.1", object_type="record"):
+                    print(result.zone_name, result.name, result.rtype)
+
+            :param str query: Searched name or content, ``*`` matches any
+                              characters and ``?`` a single one
+            :param str object_type: ``all``, ``zone``, ``record`` or
+                                    ``comment``
+            :param int max_results: Maximum number of results returned by
+                                    the API
+            :return: Generator of :class:`SearchResult`
+        """
+        url = self.get_search_url(query, object_type, max_results)
+        zones = {}
+        for raw_data in self._get(url):
+            yield SearchResult(self, raw_data, zones)
+
+    async def search_async(self, query, object_type="all", max_results=100):
+        """
+            Asynchronously search zones, records and comments, see
+            :meth:`search`
+
+            :return: List of :class:`SearchResult`
+        """
+        url = self.get_search_url(query, object_type, max_results)
+        zones = {}
+        return [SearchResult(self, raw_data, zones) for raw_data in await self._get(url)]
+
     def _load_zone_list(self):
-        result = [PDNSZone.parse(self, data) for data in self._get(self.get_zone_url())]
-        return result
+        self._apply_zone_list(self._get(self.get_zone_url()))
+        return self._zone_list
+
+    def _apply_zone_list(self, raw_list):
+        """Update zones from the zone list
+
+        Zones already known keep their loaded details unless their serial
+        moved, zones gone from the list are dropped.
+
+        :param list raw_list: Zone list from the API
+        :return list: New zones and zones whose serial moved
+        """
+        known = self._zone_index
+        changed = []
+        zones = []
+        for data in raw_list:
+            zone = known.get(data["name"])
+            if zone is None:
+                zone = PDNSZone.parse(self, data)
+                changed.append(zone)
+            elif zone._details.get("serial") != data.get("serial"):
+                zone._expire(data)
+                changed.append(zone)
+            zones.append(zone)
+        self._zone_list = zones
+        self._zone_index = {zone.get("name"): zone for zone in zones}
+        for name in set(known) - set(self._zone_index):
+            if self.zone_cache is not None:
+                self.zone_cache.invalidate((self.get("id"), name))
+            if self.snapshot_store is not None:
+                self.snapshot_store.delete_zone(self.get("id"), name)
+        return changed
+
+    def load_snapshot(self, store):
+        """
+            Load zones from a snapshot store, without any API request
+
+            Zones are loaded at the serial they were stored at, call
+            :meth:`revalidate` to reload only those which moved since. Zones
+            refreshed afterwards are written back to the store.
+
+            :param SnapshotStore store: Snapshot store
+            :return list: Zones as :class:`PDNSZone` instances
+        """
+        self.snapshot_store = store
+        zones = []
+        for name in store.zones(self.get("id")):
+            snapshot = store.load_zone(self.get("id"), name)
+            if snapshot is None:
+                continue
+            details, rrsets = snapshot
+            zone = PDNSZone(self, id=details.get("id"), name=name)
+            zone._load_compact(details, rrsets)
+            zones.append(zone)
+        self._zone_list = zones
+        self._zone_index = {zone.get("name"): zone for zone in zones}
+        LOG.info("%d zones loaded from snapshot %s", len(zones), store.path)
+        return zones
+
+    def revalidate(self):
+        """
+            Reload the zone list and expire zones whose serial moved
+
+            This costs a single request. Expired zones are reloaded on next
+            access, the others keep their details and cached rrsets.
+
+            :return list: New zones and zones whose serial moved
+        """
+        return self._apply_zone_list(self._get(self.get_zone_url()))
+
+    async def revalidate_async(self):
+        return self._apply_zone_list(await self._get(self.get_zone_url()))
+
+    async def load_zones_async(self, refresh=True):
+        """
+            Asynchronously load the zone list of this server
+
+            :param bool refresh: Also load details and rrsets of every zone,
+                                 concurrently
+            :return list: Zones as :class:`PDNSZone` instances
+        """
+        self._apply_zone_list(await self._get(self.get_zone_url()))
+        if refresh:
+            await asyncio.gather(*[zone.refresh_async()
+                                   for zone in self._zone_list])
+        return self._zone_list
 
     @property
     def zones(self):
+        """
+            Zones of this server, the list is requested on first access
+
+            Zone details and rrsets are not loaded, see :meth:`prefetch`.
+        """
+        if self._zone_list is None:
+            if self.is_async():
+                raise RuntimeError("Zone list is not loaded, await "
+                                   "load_zones_async() first")
+            self._zone_list = self._load_zone_list()
         return self._zone_list
 
+    def prefetch(self):
+        """
+            Load the zone list and the details and rrsets of every zone
+
+            :return list: Zones as :class:`PDNSZone` instances
+        """
+        for zone in self.zones:
+            zone.prefetch()
+        return self.zones
+
     def get_zone(self, name):
         """
             Get zone by name
@@ -51,9 +225,65 @@ class PDNSServer(PDNSEndpointBase):
             :param str name: Zone name (canonical)
             :return PDNSZone: Zone as :class:`PDNSZone` instance or :obj:`None`
         """
-        for zone in self._zone_list:
-            if zone.get("name") == name:
-                return zone
+        self.zones  # load zone list on first access
+        return self._zone_index.get(name)
+
+    def _find_zone(self, name, zones=None, **details):
+        """Get a zone of the zone list, or make one loaded on first access
+
+        A zone made is registered if the zone list is loaded, and kept in
+        *zones* otherwise, so it is made and loaded once.
+
+        :param str name: Zone name (canonical)
+        :param dict zones: Zones made so far, as ``{name: PDNSZone}``
+        :param details: Known zone details, for a zone made
+        :return PDNSZone: Zone
+        """
+        zone = self._zone_index.get(name)
+        if zone is None and zones is not None:
+            zone = zones.get(name)
+        if zone is None:
+            zone = PDNSZone(self, name=name, **details)
+            self._add_zone(zone)
+            if zones is not None:
+                zones[name] = zone
+        return zone
+
+    def _add_zone(self, zone):
+        """Register a created zone if the zone list is already loaded"""
+        if self._zone_list is None:
+            return
+        existing = self._zone_index.get(zone.get("name"))
+        if existing is not None:
+            self._zone_list.remove(existing)
+        self._zone_list.append(zone)
+        self._zone_index[zone.get("name")] = zone
+
+    def _remove_zone(self, zone):
+        """Unregister a deleted zone"""
+        if self._zone_index.get(zone.get("name")) is zone:
+            del self._zone_index[zone.get("name")]
+            self._zone_list.remove(zone)
 
     def create_zone(self, zone):
-        return zone.create(self)
+        zone = zone.create(self)
+        self._add_zone(zone)
+        return zone
+
+    async def create_zone_async(self, zone):
+        zone = await zone.create_async(self)
+        self._add_zone(zone)
+        return zone
+
+    def delete_zone(self, zone):
+        """
+            Delete a zone
+
+            :param PDNSZone zone: Zone to delete
+        """
+        self._delete(zone.get_url())
+        self._remove_zone(zone)
+
+    async def delete_zone_async(self, zone):
+        await self._delete(zone.get_url())
+        self._remove_zone(zone)
@@ -0,0 +1,53 @@
+class ZoneSummary(object):
+    """Read-only entry of a server zone list, see
+    :meth:`PDNSServer.list_zones`
+
+    Only the zone list response is used, no zone is loaded and no
+    :class:`PDNSZone` is built until :meth:`promote` is called.
+
+    :param PDNSServer server: Server of the zone
+    :param dict raw_data: Zone list entry
+    """
+    #: Zone list entry members kept
+    FIELDS = ("id", "name", "kind", "serial", "notified_serial", "account",
+              "dnssec", "masters")
+    __slots__ = ("_server", "_zone") + FIELDS
+
+    def __init__(self, server, raw_data):
+        """Initialization"""
+        object.__setattr__(self, "_server", server)
+        object.__setattr__(self, "_zone", None)
+        for name in self.FIELDS:
+            object.__setattr__(self, name, raw_data.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ZoneSummary is read-only, promote() it to change it")
+
+    def __repr__(self):
+        return "ZoneSummary(%s, kind=%s, serial=%s)" % (self.name, self.kind,
+                                                        self.serial)
+
+    def get(self, name):
+        """Get a zone list detail"""
+        if name not in self.FIELDS:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def json(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def promote(self):
+        """
+            Get the full zone, loaded on first access
+
+            The zone of the server zone list is returned if it is loaded,
+            otherwise a zone is made, registered in the zone list if it is
+            loaded, and returned again by next calls.
+
+            :return: :class:`PDNSZone`
+        """
+        if self._zone is None:
+            details = {name: value for name, value in self.json().items()
+                       if value is not None and name != "name"}
+            object.__setattr__(self, "_zone", self._server._find_zone(self.name, **details))
+        return self._zone
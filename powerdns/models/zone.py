@@ -1,8 +1,12 @@
-import json
 import os
 import copy
+from concurrent.futures import ThreadPoolExecutor
+from powerdns.diff import diff_rrsets, rrset_key
+from powerdns.encoder import encode_rrset, get_serializer
+from powerdns.exceptions import PDNSBatchError
 from powerdns.interface import PDNSEndpointBase, LOG
 from powerdns.models.rrset import RRSet
+from powerdns.stream import JSONStreamParser, iter_json_stream
 
 
 class PDNSZone(PDNSEndpointBase):
@@ -16,6 +20,13 @@ class PDNSZone(PDNSEndpointBase):
     :param dict api_data: PowerDNS API zone data
     """
 
+    #: Maximum number of rrsets sent per PATCH by :meth:`save`, no limit
+    #: if :obj:`None`
+    batch_size = None
+    #: Maximum estimated size in bytes of a PATCH body sent by
+    #: :meth:`save`, no limit if :obj:`None`
+    max_batch_bytes = None
+
     DEFAULTS = {
         "id": None,
         "name": None,
@@ -52,11 +63,15 @@ class PDNSZone(PDNSEndpointBase):
             raise LookupError("Please define only rrset_list OR rrsets")
 
 
+        #: Details and rrsets are requested on first access, see :meth:`get`
+        self._loaded = rrsets is not None
+        #: Details are loaded without rrsets, see :meth:`refresh_details`
+        self._details_loaded = False
+
         if rrsets is not None:
             rrsets = [RRSet.parse(self, rrset) for rrset in rrsets]
-
-        if rrset_list is not None:
-            rrsets = rrset_list
+        else:
+            rrsets = list(rrset_list)
 
         self._details = {
             "id": id,
@@ -91,27 +106,322 @@ class PDNSZone(PDNSEndpointBase):
 
         self._details = details
 
-        if server:
-            self.refresh()
-
+        #: Rrset index as ``{name: {rtype: RRSet}}``
+        self._rrset_index = {}
+        self._reindex()
+
+        #: Rrsets changed since last save as ``{(name, rtype): RRSet}``
+        self._dirty_rrsets = {}
+        #: Names of zone details changed since last save
+        self._dirty_details = set()
+        #: Amount of data sent by :meth:`save`, for payload assertions
+        self.counters = {
+            "patches": 0,
+            "metadata_updates": 0,
+            "rrsets_sent": 0,
+            "records_sent": 0,
+        }
+        #: Write-behind journal, see :meth:`enable_write_behind`
+        self.journal = None
+        self._listeners = []
 
     @classmethod
     def parse(cls, server, raw_data):
-        raw_data.pop("url")
-        raw_data.pop("last_check")
-        # ToDo parse rrsets
+        raw_data.pop("url", None)
+        raw_data.pop("last_check", None)
         return cls(server, **raw_data)
 
-    def refresh(self):
-        raw_data = self._load_details()
+    def refresh(self, stream=False, force=False):
+        """
+            Load zone details and rrsets from the API
+
+            With a :class:`~powerdns.cache.ZoneCache`, rrsets cached at the
+            serial given by the last zone list are used instead, see
+            :meth:`PDNSServer.revalidate`.
+
+            :param bool stream: Parse the response incrementally, the whole
+                                response is never held in memory. Loaded
+                                rrsets are replaced once every rrset is
+                                received, they are kept if the stream fails
+            :param bool force: Ignore the zone cache
+        """
+        if not force and self._load_from_cache():
+            return
+        if stream:
+            metadata, _ = self._pending_changes()
+            rrsets = []
+            try:
+                for rrset in self.iter_rrsets():
+                    rrsets.append(rrset)
+            finally:
+                self._details.update(metadata)
+            self._load_streamed(rrsets, metadata)
+        else:
+            self._update_details(self._load_details())
+        self._store_in_cache()
+
+    def prefetch(self):
+        """
+            Load zone details and rrsets unless they are already loaded
+            :return zone: This zone
+        """
+        if not self._loaded:
+            self.refresh()
+        return self
+
+    def refresh_details(self):
+        """
+            Load zone details only, with ``?rrsets=false``
+
+            Loaded rrsets are kept unless the serial moved. Servers which do
+            not support this option send rrsets anyway, they are loaded
+            then.
+        """
+        self._apply_details(self._get(self.get_details_url()))
+        self._details_loaded = True
+
+    async def refresh_details_async(self):
+        self._apply_details(await self._get(self.get_details_url()))
+        self._details_loaded = True
+
+    def _apply_details(self, raw_data):
+        if "rrsets" in raw_data:
+            self._update_details(raw_data)
+            self._store_in_cache()
+        elif self._details.get("serial") != raw_data.get("serial"):
+            self._expire(raw_data)
+        else:
+            metadata, _ = self._pending_changes()
+            raw_data.pop("url", None)
+            raw_data.pop("last_check", None)
+            self._details.update(raw_data)
+            self._details.update(metadata)
+
+    async def refresh_async(self, stream=False, force=False):
+        if not force and self._load_from_cache():
+            return
+        if stream:
+            metadata, _ = self._pending_changes()
+            rrsets = []
+            try:
+                async for rrset in self.iter_rrsets_async():
+                    rrsets.append(rrset)
+            finally:
+                self._details.update(metadata)
+            self._load_streamed(rrsets, metadata)
+        else:
+            self._update_details(await self._get(self.get_url()))
+        self._store_in_cache()
+
+    def _get_zone_cache(self):
+        return getattr(self._parent, "zone_cache", None)
+
+    def _cache_key(self):
+        return self._parent.get("id"), self._details.get("name")
+
+    def _load_from_cache(self):
+        """Load details and rrsets cached at the known serial
+
+        :return bool: :obj:`True` on cache hit
+        """
+        cache = self._get_zone_cache()
+        serial = self._details.get("serial")
+        if cache is None or not isinstance(serial, int):
+            return False
+        entry = cache.get(self._cache_key(), serial)
+        if entry is None:
+            return False
+        LOG.debug("zone %s loaded from cache", self._details.get("name"))
+        self._load_compact(entry.details, entry.rrsets)
+        return True
+
+    def _load_compact(self, details, rrsets):
+        """Load details and rrsets from their compact form
+
+        :param dict details: Zone details without rrsets
+        :param tuple rrsets: Rrsets as :meth:`RRSet.to_tuple` tuples
+        """
+        metadata, _ = self._pending_changes()
+        self._details.update(details)
+        self._details["rrsets"] = [RRSet.from_tuple(self, data) for data in rrsets]
+        self._loaded = True
+        self._reindex()
+        self._restore_changes(metadata)
+        self._notify()
+
+    def _store_in_cache(self):
+        cache = self._get_zone_cache()
+        store = getattr(self._parent, "snapshot_store", None)
+        if cache is None and store is None:
+            return
+        details = {name: value for name, value in self._details.items() if name != "rrsets"}
+        rrsets = tuple(rrset.to_tuple() for rrset in self._details.get("rrsets") or [])
+        if cache is not None:
+            cache.put(self._cache_key(), self._details.get("serial"), details, rrsets)
+        if store is not None:
+            store.save_zone(self._parent.get("id"), details, rrsets)
+
+    def _expire(self, raw_data):
+        """Forget loaded details once the zone list shows a new serial
+
+        :param dict raw_data: Zone list entry
+        """
+        metadata, _ = self._pending_changes()
+        raw_data.pop("url", None)
+        raw_data.pop("last_check", None)
+        self._details.update(raw_data)
+        self._details.update(metadata)
+        self._loaded = False
+        self._details_loaded = False
+        cache = self._get_zone_cache()
+        if cache is not None:
+            cache.invalidate(self._cache_key())
+
+    def _load_streamed(self, rrsets, metadata):
+        """Replace loaded rrsets once a streamed refresh is complete
+
+        Rrsets are swapped in only then, so a stream failing partway never
+        leaves a loaded zone with part of its rrsets.
+
+        :param list rrsets: Every streamed rrset
+        :param dict metadata: Changed zone details before the refresh
+        """
+        self._details["rrsets"] = rrsets
+        self._loaded = True
+        self._reindex()
+        self._restore_changes(metadata)
+        self._notify()
+
+    def _restore_changes(self, metadata):
+        """Apply pending changes again over freshly loaded details and rrsets
+
+        Loading a zone never drops changes not sent yet: changed details
+        and rrsets replace the loaded ones until the next :meth:`save`.
+
+        :param dict metadata: Changed zone details, as returned by
+                              :meth:`_pending_changes` before loading
+        """
+        self._details.update(metadata)
+        if not self._dirty_rrsets:
+            return
+        rrsets = self._details["rrsets"]
+        positions = {id(rrset): index for index, rrset in enumerate(rrsets)}
+        for rrset in self._dirty_rrsets.values():
+            loaded = self._rrset_index.get(rrset.get("name"), {}).get(rrset.get("rtype"))
+            if loaded is not None:
+                rrsets[positions[id(loaded)]] = rrset
+            elif rrset.get("changetype") != "DELETE":
+                rrsets.append(rrset)
+            else:
+                continue
+            self._index_rrset(rrset)
+
+    def _stream_event(self, event, value):
+        """Handle a zone stream event, return an :class:`RRSet` or None"""
+        if event == "item":
+            return RRSet.parse(self, value)
+        name, detail = value
+        if name != "url":
+            self._details[name] = detail
+        return None
+
+    def iter_rrsets(self, chunk_size=65536):
+        """
+            Stream zone rrsets from the API
+
+            The zone response is parsed incrementally and rrsets are
+            yielded as they are received, without being stored in the zone,
+            so memory is bounded by one rrset. Other zone details are
+            updated on the way.
+
+            :param int chunk_size: Size of read chunks in bytes
+            :return: Generator of :class:`RRSet`
+        """
+        chunks = self.get_api_client().request_stream(self.get_url(),
+                                                      chunk_size=chunk_size)
+        for event, value in iter_json_stream(chunks, "rrsets"):
+            rrset = self._stream_event(event, value)
+            if rrset is not None:
+                yield rrset
+
+    async def iter_rrsets_async(self, chunk_size=65536):
+        parser = JSONStreamParser("rrsets")
+        chunks = self.get_api_client().request_stream(self.get_url(),
+                                                      chunk_size=chunk_size)
+        async for chunk in chunks:
+            for event, value in parser.feed(chunk):
+                rrset = self._stream_event(event, value)
+                if rrset is not None:
+                    yield rrset
+        for event, value in parser.close():
+            rrset = self._stream_event(event, value)
+            if rrset is not None:
+                yield rrset
+
+    def _update_details(self, raw_data):
         raw_data["rrsets"] = [RRSet.parse(self, data) for data in raw_data["rrsets"]]
-        raw_data.pop("url")
+        metadata, _ = self._pending_changes()
+        raw_data.pop("url", None)
         self._details.update(raw_data)
+        self._loaded = True
+        self._reindex()
+        self._restore_changes(metadata)
+        self._notify()
 
     def set(self, name, value):
+        """
+            Set a zone detail, it will be sent by the next :meth:`save`
+
+            Setting ``rrsets`` replaces the whole rrset list and marks every
+            rrset as changed.
+
+            :param str name: Detail name
+            :param value: Detail value
+        """
         self._details[name] = value
+        if name == "rrsets":
+            self._reindex()
+            for rrset in value:
+                rrset._parent = self
+                self._mark_dirty(rrset)
+        else:
+            self._dirty_details.add(name)
+
+    def _mark_dirty(self, rrset):
+        """Record an rrset to be sent by the next :meth:`save`"""
+        if self.journal is not None:
+            self.journal.record(rrset)
+        else:
+            self._dirty_rrsets[rrset_key(rrset)] = rrset
+
+    @property
+    def dirty_rrsets(self):
+        """Rrsets changed since last save as list of :class:`RRSet`"""
+        return list(self._dirty_rrsets.values())
+
+    def has_changes(self):
+        """:obj:`True` if details or rrsets changed since last save"""
+        return bool(self._dirty_rrsets or self._dirty_details)
 
     def get(self, name):
+        """
+            Get a zone detail, loading the zone on first access
+
+            The zone list only carries a few details: ``rrsets`` trigger a
+            single :meth:`refresh`, any other missing detail a single
+            :meth:`refresh_details`, unless the zone is cached.
+
+            :param str name: Detail name
+        """
+        if not self._loaded and self._parent is not None and \
+                (name == "rrsets" or (name not in self._details and not self._details_loaded)):
+            if self.is_async():
+                raise RuntimeError("Zone details are not loaded, await "
+                                   "refresh_async() first")
+            if name == "rrsets":
+                self.refresh()
+            elif not self._load_from_cache():
+                self.refresh_details()
         return self._details[name]
 
     def json(self):
@@ -129,62 +439,431 @@ class PDNSZone(PDNSEndpointBase):
 
         zone_data = self._post("{}/zones".format(self._parent.get_url()), data=self.json())
         LOG.debug(zone_data)
+        self._created(zone_data)
         return self
 
-    def save(self):
+    async def create_async(self, server):
+        """
+            Asynchronously creates a new zone
+            :param server: Instance of server
+            :return zone: Created Zone
+        """
+        self._parent = server
+
+        self.patch_methods(self.get_api_client())
+
+        zone_data = await self._post("{}/zones".format(self._parent.get_url()), data=self.json())
+        LOG.debug(zone_data)
+        self._created(zone_data)
+        return self
+
+    def _created(self, zone_data):
+        """Mark the zone as loaded and clean once the API created it"""
+        if isinstance(zone_data, dict) and zone_data.get("id"):
+            self._details["id"] = zone_data["id"]
+        self._loaded = True
+        self._dirty_rrsets = {}
+        self._dirty_details = set()
+
+    def _get_save_url(self):
         if self._parent is None:
             raise AttributeError("Missing Server linkiing")
-        zone_data = self._details
+        return "{}/zones/{}".format(self._parent.get_url(), self.get("id"))
+
+    def _pending_changes(self):
+        """Get changes to send on save
+
+        :return: Changed zone details as :class:`dict` and changed rrsets
+                 as list of :class:`RRSet`
+        """
+        metadata = {name: self._details[name] for name in self._dirty_details
+                    if name in self._details}
+        return metadata, list(self._dirty_rrsets.values())
+
+    def _saved(self, metadata, rrsets):
+        """Forget sent changes, apply them to loaded rrsets, account for them"""
+        for name in metadata:
+            self._dirty_details.discard(name)
+        for rrset in rrsets:
+            key = rrset_key(rrset)
+            if self._loaded and rrset.get("changetype") == "REPLACE" and \
+                    self.get_rrset(rrset.get("name"), rrset.get("rtype")) is not rrset:
+                self.append_rrset(rrset)
+            if self._dirty_rrsets.get(key) is rrset:
+                del self._dirty_rrsets[key]
+        self._account(metadata, rrsets, 1 if rrsets else 0)
+        self._drop_deleted_rrsets(sent=rrsets)
+        if rrsets:
+            self._notify(rrsets)
+
+    def add_listener(self, callback):
+        """
+            Call a function when rrsets are loaded or changes are sent
+
+            The function is called with the zone and the sent rrsets, with
+            their changetype, or :obj:`None` when every rrset was loaded.
+
+            :param callable callback: Function called as
+                                      ``callback(zone, rrsets)``
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """Stop calling a function given to :meth:`add_listener`"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, rrsets=None):
+        for callback in self._listeners:
+            try:
+                callback(self, rrsets)
+            except Exception:
+                LOG.exception("zone %s listener %r failed", self._details.get("name"), callback)
+
+    def _account(self, metadata, rrsets, patches):
+        """Account for sent changes and invalidate the cached zone"""
+        if metadata or rrsets:
+            cache = self._get_zone_cache()
+            if cache is not None:
+                cache.invalidate(self._cache_key())
+        self.counters["patches"] += patches
+        self.counters["metadata_updates"] += len(metadata)
+        self.counters["rrsets_sent"] += len(rrsets)
+        self.counters["records_sent"] += sum(len(rrset.get_record_tuples())
+                                             for rrset in rrsets)
+
+    def save(self):
+        """
+            Send changes made since the last save
+
+            Changed zone details are sent with a PUT, changed rrsets only
+            with PATCH requests split according to :attr:`batch_size` and
+            :attr:`max_batch_bytes`, see :meth:`apply_changes`. Nothing is
+            sent if nothing changed.
+
+            With a write-behind journal, pending rrsets are flushed by the
+            journal, see :meth:`WriteBehindJournal.sync
+            <powerdns.journal.WriteBehindJournal.sync>`.
+        """
+        metadata, rrsets = self._pending_changes()
+        if metadata:
+            self._put(self._get_save_url(), data=metadata)
+            self._saved(metadata, [])
+        if self.journal is not None:
+            self.journal.sync()
+        else:
+            self.apply_changes(rrsets)
+
+    def enable_write_behind(self, max_delay=1.0, max_changes=100, path=None,
+                            fsync=False):
+        """
+            Buffer rrset changes and send them in the background
+
+            Changes are no longer sent by :meth:`RRSet.mark_as_deleted`,
+            successive edits of an rrset are merged and sent together with
+            other pending changes, see
+            :class:`~powerdns.journal.WriteBehindJournal`.
+
+            :param float max_delay: Maximum seconds a change stays buffered
+            :param int max_changes: Number of pending rrsets triggering a
+                                    flush
+            :param str path: Journal file replayed after a crash, optional
+            :param bool fsync: Sync the journal file on every change
+            :return: :class:`~powerdns.journal.WriteBehindJournal`
+        """
+        from powerdns.journal import WriteBehindJournal
+        if self.journal is None:
+            WriteBehindJournal(self, max_delay, max_changes, path, fsync)
+        return self.journal
+
+    def import_zone_file(self, source, **kwargs):
+        """
+            Send the rrsets of a BIND master file, while reading it
+
+            See :func:`powerdns.zonefile.import_zone_file` for options.
+
+            :param source: File name or iterable of lines
+            :return: Number of rrsets sent
+        """
+        from powerdns.zonefile import import_zone_file
+        return import_zone_file(self, source, **kwargs)
+
+    def export_zone_file(self, destination, **kwargs):
+        """
+            Write rrsets as a BIND master file, streamed if not loaded
+
+            See :func:`powerdns.zonefile.export_zone_file` for options.
+
+            :param destination: File name or writable text file
+            :return: Number of records written
+        """
+        from powerdns.zonefile import export_zone_file
+        return export_zone_file(self, destination, **kwargs)
+
+    def disable_write_behind(self):
+        """Flush pending changes and send the next ones on :meth:`save`"""
+        if self.journal is not None:
+            self.journal.close()
+
+    async def save_async(self):
+        metadata, rrsets = self._pending_changes()
+        if metadata:
+            await self._put(self._get_save_url(), data=metadata)
+            self._saved(metadata, [])
+        batches = self.split_batches(rrsets, self.batch_size, self.max_batch_bytes)
+        for index, batch in enumerate(batches):
+            try:
+                await self._patch(self._get_save_url(), data={"rrsets": batch})
+            except Exception as error:
+                raise self._batch_error(error, index, len(batches), batch)
+            self._saved({}, batch)
+
+    def split_batches(self, rrsets, batch_size=None, max_batch_bytes=None):
+        """
+            Split rrsets into batches bounded by count and estimated size
 
-        #if len(self.get("rrsets")) > 0:
-        #    zone_data["rrsets"] = self.rrset_list
+            Sizes are measured with the serializer of the API client, as
+            rrsets are sent. An rrset bigger than *max_batch_bytes* is sent
+            alone.
 
-        zone_info = self._patch("{}/zones/{}".format(self._parent.get_url(), self.get("id")), data=zone_data)
+            :param list rrsets: Rrsets as list of :class:`RRSet`
+            :param int batch_size: Maximum number of rrsets per batch
+            :param int max_batch_bytes: Maximum estimated JSON size per batch
+            :return: List of rrset lists
+        """
+        serializer = None
+        if max_batch_bytes:
+            serializer = getattr(self.get_api_client(), "_serializer", None) or get_serializer()
+        batches = []
+        batch, batch_bytes = [], 0
+        for rrset in rrsets:
+            size = 0
+            if serializer is not None:
+                size = len(serializer.dumps(encode_rrset(rrset))) + 1
+            if batch and ((batch_size and len(batch) >= batch_size) or
+                          (max_batch_bytes and batch_bytes + size > max_batch_bytes)):
+                batches.append(batch)
+                batch, batch_bytes = [], 0
+            batch.append(rrset)
+            batch_bytes += size
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _batch_error(self, error, index, count, batch):
+        LOG.error("rrset batch %d/%d of zone %s failed", index + 1, count, self.get("name"))
+        return PDNSBatchError(url=getattr(error, "url", self._get_save_url()),
+                              status_code=getattr(error, "status_code", 0),
+                              message=getattr(error, "message", str(error)),
+                              batch_index=index, batch_count=count,
+                              rrsets=batch, error=error)
+
+    def apply_changes(self, rrsets=None, batch_size=None, max_batch_bytes=None,
+                      pipeline=1, resume_from=0):
+        """
+            Send rrset changes in bounded PATCH batches, in order
+
+            Each batch is applied atomically by PowerDNS. Successful batches
+            are applied to the local rrsets and no longer pending, so a
+            failed :meth:`save` can simply be called again. When a batch
+            fails, :class:`~powerdns.exceptions.PDNSBatchError` tells which
+            one, and its ``resume_from`` can be passed back with the same
+            *rrsets* to resume. Pending changes are always sent from the
+            first one still pending, *resume_from* is ignored for them.
+
+            :param list rrsets: Rrsets with their changetype set, pending
+                                changes if :obj:`None`
+            :param int batch_size: Maximum number of rrsets per PATCH,
+                                   defaults to :attr:`batch_size`
+            :param int max_batch_bytes: Maximum estimated PATCH body size,
+                                        defaults to :attr:`max_batch_bytes`
+            :param int pipeline: Number of batches sent concurrently. Each
+                                 (name, type) appears in one batch only, so
+                                 batches do not depend on each other.
+            :param int resume_from: Index of the first batch to send
+            :return: Number of batches
+            :raise PDNSBatchError: If a batch failed, about the first one
+        """
+        if rrsets is None:
+            rrsets = self.dirty_rrsets
+            resume_from = 0
+        batches = self.split_batches(rrsets,
+                                     batch_size or self.batch_size,
+                                     max_batch_bytes or self.max_batch_bytes)
+        pending = list(enumerate(batches))[resume_from:]
+        if not pending:
+            return len(batches)
+        url = self._get_save_url()
+
+        if pipeline <= 1:
+            for index, batch in pending:
+                try:
+                    self._patch(url, data={"rrsets": batch})
+                except Exception as error:
+                    raise self._batch_error(error, index, len(batches), batch)
+                self._saved({}, batch)
+            return len(batches)
+
+        failure = None
+        with ThreadPoolExecutor(max_workers=pipeline) as executor:
+            futures = [(index, batch, executor.submit(self._patch, url, data={"rrsets": batch}))
+                       for index, batch in pending]
+            for index, batch, future in futures:
+                try:
+                    future.result()
+                except Exception as error:
+                    if failure is None:
+                        failure = self._batch_error(error, index, len(batches), batch)
+                    continue
+                self._saved({}, batch)
+        if failure is not None:
+            raise failure
+        return len(batches)
 
     def get_url(self):
         return "{}/zones/{}".format(self._parent.get_url(), self.get("name"))
 
+    def get_details_url(self):
+        return "{}?rrsets=false".format(self.get_url())
+
     def _load_details(self):
         raw_data = self._get(self.get_url())
         return raw_data
 
+    def _reindex(self):
+        """Rebuild the rrset index from the rrset list"""
+        self._rrset_index = {}
+        for rrset in self._details.get("rrsets") or []:
+            self._index_rrset(rrset)
+
+    def _index_rrset(self, rrset):
+        self._rrset_index.setdefault(rrset.get("name"), {})[rrset.get("rtype")] = rrset
+
+    def _unindex_rrset(self, rrset, rtype=None):
+        if rtype is None:
+            rtype = rrset.get("rtype")
+        by_type = self._rrset_index.get(rrset.get("name"), {})
+        if by_type.get(rtype) is rrset:
+            del by_type[rtype]
+            if not by_type:
+                del self._rrset_index[rrset.get("name")]
+
+    def _reindex_rrset(self, rrset, old_rtype):
+        """Move an rrset in the index after its type changed
+
+        The rrset of the previous type is deleted on next save.
+        """
+        self._unindex_rrset(rrset, old_rtype)
+        self._index_rrset(rrset)
+        old_key = (rrset.get("name"), old_rtype)
+        if self._dirty_rrsets.get(old_key) is rrset:
+            del self._dirty_rrsets[old_key]
+        if old_rtype is not None:
+            self._mark_dirty(RRSet(self, name=rrset.get("name"), rtype=old_rtype,
+                                   records=[], ttl=rrset.get("ttl"), changetype="DELETE"))
+
+    def _drop_deleted_rrsets(self, sent=None):
+        """Forget rrsets whose deletion has been sent to the API
+
+        :param list sent: Sent rrsets, every deleted rrset if :obj:`None`
+        """
+        rrsets = self._details.get("rrsets")
+        if not rrsets:
+            return
+        if sent is not None:
+            sent = {id(rrset) for rrset in sent if rrset.get("changetype") == "DELETE"}
+            if not sent:
+                return
+        kept = []
+        for rrset in rrsets:
+            if rrset.get("changetype") == "DELETE" and (sent is None or id(rrset) in sent):
+                self._unindex_rrset(rrset)
+            else:
+                kept.append(rrset)
+        self._details["rrsets"] = kept
+
     @classmethod
-    def get_rrset_from_list(cls, rrset_list, rrset_name):
+    def get_rrset_from_list(cls, rrset_list, rrset_name, rtype=None):
         """
-        Get record data
+        Get record data from any rrset list by linear scan
+
+        Zone rrsets are indexed, use :meth:`get_rrset` for them.
 
-        :param str name: Record name
+        :param list rrset_list: List of :class:`RRSet`
+        :param str rrset_name: Record name
+        :param str rtype: Record type, any type if :obj:`None`
         :return: Records rrset
         """
         for rr in rrset_list:
-            if rrset_name == rr.get("name"):
+            if rrset_name == rr.get("name") and \
+                    (rtype is None or rtype == rr.get("rtype")):
                 return rr
 
-    def get_rrset(self, name):
-        return self.__class__.get_rrset_from_list(self.get("rrsets"), name)
+    def get_rrset(self, name, rtype=None):
+        """
+        Get rrset by name and type
+
+        :param str name: Record name (canonical)
+        :param str rtype: Record type, the first rrset loaded for this name
+                          is returned if :obj:`None`
+        :return: :class:`RRSet` or :obj:`None`
+        """
+        self.get("rrsets")  # load rrsets on first access
+        by_type = self._rrset_index.get(name)
+        if not by_type:
+            return None
+        if rtype is None:
+            return next(iter(by_type.values()))
+        return by_type.get(rtype)
+
+    def get_rrsets(self, name):
+        """
+        Get every rrset of a name
+
+        :param str name: Record name (canonical)
+        :return: List of :class:`RRSet`
+        """
+        self.get("rrsets")  # load rrsets on first access
+        return list(self._rrset_index.get(name, {}).values())
 
     def append_rrset(self, rrset):
+        """
+        Add an rrset to the zone, replacing the one with same name and type
+
+        :param RRSet rrset: Rrset to add
+        """
         assert isinstance(rrset, RRSet)
         rrsets = self.get("rrsets")
-        rrset._zone = self
-        rrsets.append(rrset)
-        self.set("rrsets", rrsets)
+        rrset._parent = self
+        existing = self.get_rrset(rrset.get("name"), rrset.get("rtype"))
+        if existing is not None:
+            rrsets[rrsets.index(existing)] = rrset
+        else:
+            rrsets.append(rrset)
+        self._index_rrset(rrset)
+        self._mark_dirty(rrset)
 
     def full_rrset_update(self, rrsets_for_update):
-        new_rrsets = []
-        for rr in self.get("rrsets"):
-            exists_rrset = self.__class__.get_rrset_from_list(rrsets_for_update, rr.get("name"))
-            if exists_rrset:
-                rr.set("changetype", "REPLACE")
-                new_rrsets.append(exists_rrset)
-            else:
-                if rr.get("rtype") not in ["SOA", "NS"]:
-                    rr.set("changetype", "DELETE")
-                    new_rrsets.append(rr)
-
-        for newrr in rrsets_for_update:
-            if not self.__class__.get_rrset_from_list(new_rrsets, newrr.get("name")):
-                new_rrsets.append(newrr)
+        """
+        Stage zone rrsets to match a desired state
 
+        Rrsets are matched by name and type. Changed or missing rrsets are
+        replaced, rrsets missing from the desired state are marked as
+        deleted except SOA and NS ones. Unchanged rrsets are kept as is.
 
-        self.set("rrsets", new_rrsets)
+        :param list rrsets_for_update: Desired rrsets as list of :class:`RRSet`
+        :return: Staged changes as :class:`~powerdns.diff.ChangePlan`, use
+                 its :meth:`~powerdns.diff.ChangePlan.apply` to send only
+                 them
+        """
+        plan = diff_rrsets(self.get("rrsets"), rrsets_for_update, zone=self)
+        replaced = {rrset_key(rrset) for rrset in plan.rrsets()
+                    if rrset.get("changetype") == "REPLACE"}
+
+        new_rrsets = [rr for rr in self.get("rrsets") if rrset_key(rr) not in replaced]
+        new_rrsets += [change.rrset for change in plan.replaces]
+        self._details["rrsets"] = new_rrsets
+        self._reindex()
+        for change in plan:
+            self._mark_dirty(change.rrset)
+        return plan
@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+powerdns.reconcile - Desired state reconciliation of many zones
+"""
+
+import hashlib
+from collections import namedtuple
+
+from powerdns.diff import PROTECTED_TYPES, ChangePlan, RRSetChange, rrset_content, rrset_key
+from powerdns.fanout import fan_out
+from powerdns.interface import LOG
+from powerdns.models.rrset import RRSet
+from powerdns.models.zone import PDNSZone
+
+#: Known content of a zone: its serial, the digest of the last desired
+#: state found applied at this serial, and rrset hashes by ``(name, rtype)``
+ZoneState = namedtuple("ZoneState", ("serial", "digest", "hashes"))
+
+
+def rrset_hash(rrset):
+    """Hash the content of an rrset
+
+    Like :func:`~powerdns.diff.rrset_content`, records order and
+    duplicates are not significant. Name and type are not hashed, rrsets
+    are compared by ``(name, rtype)``.
+
+    :param RRSet rrset: Rrset
+    :return: 16 bytes digest as :class:`bytes`
+    """
+    ttl, records = rrset_content(rrset)
+    digest = hashlib.blake2b(str(ttl).encode(), digest_size=16)
+    for content, disabled in sorted(records):
+        digest.update(b"\n%d%s" % (disabled, content.encode()))
+    return digest.digest()
+
+
+def zone_digest(hashes):
+    """Hash a whole zone from the hashes of its rrsets
+
+    :param dict hashes: Rrset hashes as ``{(name, rtype): hash}``
+    :return: 16 bytes digest as :class:`bytes`
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for (name, rtype), value in sorted(hashes.items()):
+        digest.update(b"%s\t%s\t%s\n" % (name.encode(), rtype.encode(), value))
+    return digest.digest()
+
+
+class ZonePlan(object):
+    """Planned reconciliation of one zone
+
+    :param str name: Zone name
+    :param str action: ``create``, ``update`` or ``unchanged``
+    :param list rrsets: Desired rrsets as list of :class:`RRSet`
+    :param dict hashes: Desired rrset hashes
+    :param PDNSZone zone: Existing zone, :obj:`None` for ``create``
+    """
+    __slots__ = ("name", "action", "rrsets", "hashes", "zone", "changes",
+                 "live", "error")
+
+    def __init__(self, name, action, rrsets, hashes, zone=None):
+        """Initialization"""
+        self.name = name
+        self.action = action
+        self.rrsets = rrsets
+        self.hashes = hashes
+        self.zone = zone
+        #: Rrset changes of an ``update`` as :class:`~powerdns.diff.ChangePlan`
+        self.changes = None
+        #: Live rrset hashes the plan was computed against
+        self.live = {}
+        #: Exception raised while applying, if any
+        self.error = None
+
+    def __repr__(self):
+        if self.action == "update":
+            return "ZonePlan(%s, update, replace=%d, delete=%d)" % (
+                self.name, len(self.changes.replaces), len(self.changes.deletes))
+        return "ZonePlan(%s, %s)" % (self.name, self.action)
+
+    def __len__(self):
+        if self.action == "create":
+            return len(self.rrsets)
+        if self.action == "update":
+            return len(self.changes)
+        return 0
+
+    @property
+    def digest(self):
+        """Digest of the desired state, see :func:`zone_digest`"""
+        return zone_digest(self.hashes)
+
+
+class ReconcilePlan(object):
+    """Planned reconciliation of many zones, see :meth:`Reconciler.plan`"""
+    def __init__(self, zones=None):
+        """Initialization"""
+        #: Zone plans as list of :class:`ZonePlan`, in desired state order
+        self.zones = zones or []
+        #: :obj:`True` once applied by :meth:`Reconciler.apply`
+        self.applied = False
+
+    def __repr__(self):
+        return "ReconcilePlan(create=%d, update=%d, unchanged=%d, changes=%d)" % (
+            len(self.creates), len(self.updates), len(self.unchanged), len(self))
+
+    def __len__(self):
+        return sum(len(zone) for zone in self.zones)
+
+    def __iter__(self):
+        return iter(self.zones)
+
+    def _by_action(self, action):
+        return [zone for zone in self.zones if zone.action == action]
+
+    @property
+    def creates(self):
+        """Zones to create as list of :class:`ZonePlan`"""
+        return self._by_action("create")
+
+    @property
+    def updates(self):
+        """Zones with rrset changes as list of :class:`ZonePlan`"""
+        return self._by_action("update")
+
+    @property
+    def unchanged(self):
+        """Zones already in the desired state as list of :class:`ZonePlan`"""
+        return self._by_action("unchanged")
+
+    @property
+    def errors(self):
+        """Zones which failed to apply as list of :class:`ZonePlan`"""
+        return [zone for zone in self.zones if zone.error is not None]
+
+    def describe(self):
+        """Get a human readable description of the plan
+
+        :return: One line per change as list of :class:`str`
+        """
+        lines = []
+        for zone in self.zones:
+            if zone.action == "create":
+                lines.append("create zone %s (%d rrsets)" % (zone.name, len(zone.rrsets)))
+            elif zone.action == "update":
+                for change in zone.changes:
+                    lines.append("%s %s %s %s" % ((change.changetype.lower(), zone.name)
+                                                  + rrset_key(change.rrset)))
+        return lines
+
+
+class Reconciler(object):
+    """Bring the zones of a server to a desired state
+
+    A desired state maps zone names to their rrsets. Each rrset is reduced
+    to a content hash, see :func:`rrset_hash`, and compared with the hash
+    of the live rrset of same name and type. Missing zones are created,
+    differing or missing rrsets replaced, and rrsets missing from the
+    desired state deleted, except protected types. Zones are applied
+    concurrently, by at most *max_workers* threads::
+
+        reconciler = Reconciler(server, nameservers=["ns1.example.com."])
+        plan = reconciler.reconcile(desired, dry_run=True)
+        print("\\n".join(plan.describe()))
+        reconciler.apply(plan)
+
+    The reconciler remembers the hashes of each zone at its serial. The zone
+    list is requested once per plan: zones whose serial did not move are
+    compared with the remembered hashes, without requesting their rrsets,
+    and zones whose desired state did not change either are skipped by a
+    single digest comparison. Serials of applied zones are read back from
+    one more zone list request, changes made by someone else in the
+    meantime are not noticed until the serial moves again.
+
+    :param PDNSServer server: Server, with a synchronous API client
+    :param int max_workers: Maximum number of zones loaded or applied
+                            concurrently
+    :param tuple protected: Record types never deleted
+    :param str kind: Kind of created zones
+    :param list nameservers: Nameservers of created zones
+    """
+    def __init__(self, server, max_workers=8, protected=PROTECTED_TYPES,
+                 kind="Native", nameservers=None):
+        """Initialization"""
+        if server.is_async():
+            raise RuntimeError("Reconciliation requires a synchronous API client")
+        self.server = server
+        self.max_workers = max_workers
+        self.protected = protected
+        self.kind = kind
+        self.nameservers = list(nameservers or [])
+        #: Known zone states as ``{name: ZoneState}``
+        self.states = {}
+
+    def reconcile(self, desired, dry_run=False):
+        """Plan and apply a desired state
+
+        :param dict desired: Desired rrsets by zone name, as
+                             ``{name: [RRSet]}``
+        :param bool dry_run: Only compute the plan
+        :return: :class:`ReconcilePlan`
+        """
+        plan = self.plan(desired)
+        if not dry_run:
+            self.apply(plan)
+        return plan
+
+    def plan(self, desired):
+        """Compute the changes bringing zones to a desired state
+
+        Nothing is sent to the API, only the zone list and the rrsets of
+        zones whose serial is unknown or moved are requested.
+
+        :param dict desired: Desired rrsets by zone name, as
+                             ``{name: [RRSet]}``
+        :return: :class:`ReconcilePlan`
+        """
+        if self.server._zone_list is None:
+            self.server.zones  # load zone list on first access
+        else:
+            self.server.revalidate()
+        plan = ReconcilePlan()
+        observe = []
+        for name, rrsets in desired.items():
+            rrsets = list(rrsets)
+            hashes = {rrset_key(rrset): rrset_hash(rrset) for rrset in rrsets}
+            zone = self.server.get_zone(name)
+            if zone is None:
+                plan.zones.append(ZonePlan(name, "create", rrsets, hashes))
+                continue
+            zone_plan = ZonePlan(name, "update", rrsets, hashes, zone)
+            state = self.states.get(name)
+            if state is None or state.serial != zone._details.get("serial"):
+                observe.append(zone_plan)
+            plan.zones.append(zone_plan)
+
+        for result in fan_out(lambda zone_plan: self._observe(zone_plan.zone),
+                              observe, self.max_workers):
+            result.result()
+
+        for zone_plan in plan.zones:
+            if zone_plan.action == "update":
+                self._plan_zone(zone_plan)
+        LOG.info("reconciliation of %d zones planned: %r", len(plan.zones), plan)
+        return plan
+
+    def _observe(self, zone):
+        """Hash the live rrsets of a zone, loading them if needed"""
+        zone.prefetch()
+        self.states[zone.get("name")] = ZoneState(
+            zone._details.get("serial"), None,
+            {rrset_key(rrset): rrset_hash(rrset) for rrset in zone.get("rrsets")})
+
+    def _plan_zone(self, zone_plan):
+        state = self.states[zone_plan.name]
+        zone_plan.live = state.hashes
+        digest = zone_plan.digest
+        if state.digest == digest:
+            zone_plan.action = "unchanged"
+            return
+        zone = zone_plan.zone
+        changes = ChangePlan(zone)
+        for rrset in zone_plan.rrsets:
+            key = rrset_key(rrset)
+            if state.hashes.get(key) == zone_plan.hashes[key]:
+                changes.unchanged += 1
+            else:
+                changes.changes.append(RRSetChange("REPLACE", rrset, self._live_rrset(zone, key)))
+        for key in state.hashes:
+            if key not in zone_plan.hashes and key[1] not in self.protected:
+                current = self._live_rrset(zone, key)
+                if current is None:
+                    current = RRSet(name=key[0], rtype=key[1], records=[])
+                changes.changes.append(RRSetChange("DELETE", current, current))
+        if changes.changes:
+            zone_plan.changes = changes
+        else:
+            zone_plan.action = "unchanged"
+            self.states[zone_plan.name] = state._replace(digest=digest)
+
+    @staticmethod
+    def _live_rrset(zone, key):
+        """Get a loaded rrset, without loading the zone"""
+        if not zone._loaded:
+            return None
+        return zone._rrset_index.get(key[0], {}).get(key[1])
+
+    def apply(self, plan):
+        """Apply a plan, zones concurrently
+
+        Errors do not stop the other zones, they are stored in
+        :attr:`ZonePlan.error`, see :attr:`ReconcilePlan.errors`. Zones
+        which failed are loaded again by the next plan.
+
+        :param ReconcilePlan plan: Plan from :meth:`plan`
+        :return: The plan
+        """
+        pending = plan.creates + plan.updates
+        applied = []
+        for result in fan_out(self._apply_zone, pending, self.max_workers):
+            if result.ok:
+                applied.append(result.item)
+            else:
+                result.item.error = result.error
+                self.states.pop(result.item.name, None)
+        plan.applied = True
+        if not applied:
+            return plan
+
+        serials = {data["name"]: data.get("serial")
+                   for data in self.server._get(self.server.get_zone_url())}
+        for zone_plan in applied:
+            serial = serials.get(zone_plan.name)
+            if zone_plan.zone is not None:
+                zone_plan.zone._details["serial"] = serial
+            hashes = dict(zone_plan.live)
+            for change in zone_plan.changes or ():
+                if change.changetype == "DELETE":
+                    hashes.pop(rrset_key(change.rrset), None)
+            hashes.update(zone_plan.hashes)
+            self.states[zone_plan.name] = ZoneState(serial, zone_plan.digest, hashes)
+        LOG.info("reconciliation applied to %d zones, %d failed",
+                 len(applied), len(pending) - len(applied))
+        return plan
+
+    def _apply_zone(self, zone_plan):
+        if zone_plan.action == "create":
+            zone = PDNSZone(name=zone_plan.name, kind=self.kind,
+                            nameservers=list(self.nameservers),
+                            rrsets=[rrset.json() for rrset in zone_plan.rrsets])
+            zone_plan.zone = self.server.create_zone(zone)
+        else:
+            zone_plan.changes.apply()
+        return zone_plan
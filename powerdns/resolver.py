@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+powerdns.resolver - Offline authoritative resolution over loaded zones
+"""
+
+import threading
+
+from powerdns.interface import LOG
+
+NOERROR = "NOERROR"
+NXDOMAIN = "NXDOMAIN"
+SERVFAIL = "SERVFAIL"
+#: Name outside of every zone of the resolver
+REFUSED = "REFUSED"
+
+
+def _canonical(name):
+    name = name.lower()
+    return name if name.endswith(".") else name + "."
+
+
+def _parent(name):
+    """Get the parent of an absolute name, :obj:`None` for the root"""
+    if name == ".":
+        return None
+    parent = name.split(".", 1)[1]
+    return parent or "."
+
+
+class Answer(object):
+    """Outcome of :meth:`Resolver.resolve`
+
+    :param str qname: Queried name
+    :param str qtype: Queried type
+    """
+    __slots__ = ("qname", "qtype", "rcode", "records", "chain", "zone",
+                 "referral", "authority", "wildcard")
+
+    def __init__(self, qname, qtype):
+        """Initialization"""
+        self.qname = qname
+        self.qtype = qtype
+        #: ``NOERROR``, ``NXDOMAIN``, ``SERVFAIL`` or ``REFUSED``
+        self.rcode = NOERROR
+        #: Answer records as ``(name, rtype, ttl, content)`` tuples,
+        #: followed CNAME records included
+        self.records = []
+        #: Names the query was redirected to by CNAME records
+        self.chain = []
+        #: Name of the zone which answered last
+        self.zone = None
+        #: :obj:`True` if the name is delegated to other nameservers
+        self.referral = False
+        #: NS records of the delegation for a referral, as ``(name, rtype,
+        #: ttl, content)`` tuples
+        self.authority = []
+        #: :obj:`True` if a wildcard record answered
+        self.wildcard = False
+
+    def __repr__(self):
+        return "Answer(%s %s, %s, %d records%s)" % (
+            self.qname, self.qtype, self.rcode, len(self.records),
+            ", referral" if self.referral else "")
+
+    @property
+    def ok(self):
+        """:obj:`True` if records of the queried type were found"""
+        return self.rcode == NOERROR and not self.referral and \
+            any(record[1] == self.qtype or self.qtype == "ANY"
+                for record in self.records)
+
+    @property
+    def target(self):
+        """Name finally answering, after CNAME records"""
+        return self.chain[-1] if self.chain else self.qname
+
+
+class _ZoneData(object):
+    """Records of one zone, indexed for resolution"""
+    __slots__ = ("name", "names", "cuts", "empty")
+
+    def __init__(self, name):
+        self.name = name
+        #: ``{name: {rtype: (ttl, contents)}}``, enabled records only
+        self.names = {}
+        #: Names below the apex holding NS records
+        self.cuts = set()
+        #: Reference counts of empty non-terminal names
+        self.empty = {}
+
+    def set_rrset(self, name, rtype, ttl, contents):
+        name = _canonical(name)
+        if not contents:
+            self.delete_rrset(name, rtype)
+            return
+        by_type = self.names.get(name)
+        if by_type is None:
+            by_type = self.names[name] = {}
+            self._count_ancestors(name, 1)
+        by_type[rtype] = (ttl, contents)
+        if rtype == "NS" and name != self.name:
+            self.cuts.add(name)
+
+    def delete_rrset(self, name, rtype):
+        name = _canonical(name)
+        by_type = self.names.get(name)
+        if by_type is None or by_type.pop(rtype, None) is None:
+            return
+        if rtype == "NS":
+            self.cuts.discard(name)
+        if not by_type:
+            del self.names[name]
+            self._count_ancestors(name, -1)
+
+    def _count_ancestors(self, name, delta):
+        name = _parent(name)
+        while name is not None and name != self.name and name.endswith(self.name):
+            count = self.empty.get(name, 0) + delta
+            if count:
+                self.empty[name] = count
+            else:
+                del self.empty[name]
+            name = _parent(name)
+
+    def exists(self, name):
+        return name in self.names or name in self.empty or name == self.name
+
+    def find_cut(self, name):
+        """Get the highest delegation point at or above a name"""
+        if not self.cuts:
+            return None
+        cut = None
+        while name is not None and name != self.name:
+            if name in self.cuts:
+                cut = name
+            name = _parent(name)
+        return cut
+
+    def find_wildcard(self, name):
+        """Get the wildcard records matching a missing name, if any"""
+        name = _parent(name)
+        while name is not None:
+            if self.exists(name):
+                return self.names.get("*." + name if name != "." else "*.")
+            name = _parent(name)
+        return None
+
+
+class Resolver(object):
+    """Answer queries from loaded zones, without any request
+
+    Zones are found by longest suffix in a trie of reversed labels. Exact
+    matches, empty non-terminals, wildcards, delegations and CNAME chains,
+    across zones, are handled like an authoritative server would, from the
+    rrsets loaded in the zones, disabled records excluded::
+
+        resolver = Resolver(server.prefetch())
+        answer = resolver.resolve("www.example.com.", "A")
+        if not answer.ok:
+            print(answer.rcode, answer.chain)
+
+    Zones added are followed: the resolver is updated when they are
+    refreshed or their changes are sent, see
+    :meth:`PDNSZone.add_listener`.
+
+    :param iterable zones: Zones as :class:`PDNSZone`, loaded if needed
+    :param int max_chain: Maximum number of CNAME records followed
+    """
+    def __init__(self, zones=(), max_chain=16):
+        """Initialization"""
+        self.max_chain = max_chain
+        self._lock = threading.Lock()
+        #: Trie nodes are ``[children, zone data]``, root is the DNS root
+        self._root = [{}, None]
+        self._zones = {}
+        for zone in zones:
+            self.add_zone(zone)
+
+    def __len__(self):
+        return len(self._zones)
+
+    def __contains__(self, name):
+        return _canonical(name) in self._zones
+
+    def add_zone(self, zone, follow=True):
+        """
+            Index the rrsets of a zone
+
+            :param PDNSZone zone: Zone, loaded if needed
+            :param bool follow: Update the resolver when the zone is
+                                refreshed or saved
+        """
+        data = self._build(zone)
+        with self._lock:
+            node = self._root
+            for label in self._labels(data.name):
+                node = node[0].setdefault(label, [{}, None])
+            node[1] = data
+            self._zones[data.name] = (zone, data)
+        if follow:
+            zone.add_listener(self._zone_changed)
+        LOG.debug("resolver indexed zone %s", data.name)
+
+    def remove_zone(self, zone):
+        """
+            Stop answering for a zone
+
+            :param zone: :class:`PDNSZone` or zone name
+        """
+        name = _canonical(zone if isinstance(zone, str) else zone.get("name"))
+        with self._lock:
+            entry = self._zones.pop(name, None)
+            node = self._root
+            for label in self._labels(name):
+                node = node[0].get(label)
+                if node is None:
+                    break
+            else:
+                node[1] = None
+        if entry is not None:
+            entry[0].remove_listener(self._zone_changed)
+
+    @staticmethod
+    def _labels(name):
+        """Reversed labels of an absolute name"""
+        if name == ".":
+            return []
+        return name[:-1].split(".")[::-1]
+
+    @staticmethod
+    def _build(zone):
+        data = _ZoneData(_canonical(zone.get("name")))
+        for rrset in zone.get("rrsets"):
+            if rrset.get("changetype") == "DELETE":
+                continue
+            data.set_rrset(rrset.get("name"), rrset.get("rtype"), rrset.get("ttl"),
+                           tuple(content for content, disabled in rrset.get_record_tuples()
+                                 if not disabled))
+        return data
+
+    def _zone_changed(self, zone, rrsets):
+        name = _canonical(zone.get("name"))
+        entry = self._zones.get(name)
+        if entry is None or entry[0] is not zone:
+            return
+        if rrsets is None:
+            self.add_zone(zone, follow=False)
+            return
+        data = entry[1]
+        with self._lock:
+            for rrset in rrsets:
+                if rrset.get("changetype") == "DELETE":
+                    data.delete_rrset(rrset.get("name"), rrset.get("rtype"))
+                else:
+                    data.set_rrset(rrset.get("name"), rrset.get("rtype"), rrset.get("ttl"),
+                                   tuple(content for content, disabled
+                                         in rrset.get_record_tuples() if not disabled))
+
+    def find_zone(self, name):
+        """
+            Get the zone holding a name, by longest suffix
+
+            :param str name: Domain name
+            :return: Zone name as :class:`str` or :obj:`None`
+        """
+        data = self._find(_canonical(name))
+        return data.name if data is not None else None
+
+    def _find(self, name):
+        node = self._root
+        found = node[1]
+        for label in self._labels(name):
+            node = node[0].get(label)
+            if node is None:
+                break
+            if node[1] is not None:
+                found = node[1]
+        return found
+
+    def resolve(self, qname, qtype="A"):
+        """
+            Resolve a name from the loaded zones
+
+            :param str qname: Queried name
+            :param str qtype: Queried record type, ``ANY`` for every type
+            :return: :class:`Answer`
+        """
+        qtype = qtype.upper()
+        answer = Answer(_canonical(qname), qtype)
+        name = answer.qname
+        for _ in range(self.max_chain + 1):
+            data = self._find(name)
+            if data is None:
+                if not answer.chain:
+                    answer.rcode = REFUSED
+                return answer
+            answer.zone = data.name
+            cut = data.find_cut(name)
+            if cut is not None and not (cut == name and qtype == "DS"):
+                ttl, contents = data.names[cut]["NS"]
+                answer.referral = True
+                answer.authority = [(cut, "NS", ttl, content) for content in contents]
+                return answer
+            by_type = data.names.get(name)
+            if by_type is None:
+                if data.exists(name):
+                    return answer
+                by_type = data.find_wildcard(name)
+                if by_type is None:
+                    answer.rcode = NXDOMAIN
+                    return answer
+                answer.wildcard = True
+            if qtype == "ANY":
+                for rtype, (ttl, contents) in by_type.items():
+                    answer.records.extend((name, rtype, ttl, content) for content in contents)
+                return answer
+            if qtype in by_type:
+                ttl, contents = by_type[qtype]
+                answer.records.extend((name, qtype, ttl, content) for content in contents)
+                return answer
+            if "CNAME" not in by_type:
+                return answer
+            ttl, contents = by_type["CNAME"]
+            answer.records.append((name, "CNAME", ttl, contents[0]))
+            name = _canonical(contents[0])
+            if name in answer.chain or name == answer.qname:
+                LOG.debug("CNAME loop resolving %s", answer.qname)
+                answer.rcode = SERVFAIL
+                return answer
+            answer.chain.append(name)
+        answer.rcode = SERVFAIL
+        return answer
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+powerdns.retry - Retry policy and circuit breaker of API requests
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from .exceptions import PDNSError
+
+#: Methods safe to send again, the API applies them the same way twice
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+
+#: Response codes worth retrying
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header
+
+    :param str value: Header value, in seconds or as an HTTP date
+    :return: Delay in seconds as :class:`float`, or :obj:`None`
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+
+class RetryPolicy(object):
+    """Retry policy of API requests
+
+    Failed requests are sent again after an exponential backoff with full
+    jitter: the delay before retry *n* is random between 0 and
+    ``min(max_backoff, backoff * 2 ** n)``. A ``Retry-After`` header sent
+    with the error takes precedence, up to *max_backoff*.
+
+    Only requests failing with a connection error, a timeout or one of
+    *statuses* are retried, and only if their method is idempotent: a POST
+    creating a zone may have been applied before the connection dropped.
+
+    :param int max_attempts: Maximum number of attempts, including the
+                             first one
+    :param float backoff: Base delay in seconds
+    :param float max_backoff: Maximum delay in seconds
+    :param iterable statuses: Response codes to retry
+    :param iterable methods: HTTP methods to retry
+
+    Example::
+
+        api_client = PDNSApiClient(api_endpoint, api_key,
+                                   retry=RetryPolicy(max_attempts=5))
+    """
+    def __init__(self, max_attempts=3, backoff=0.5, max_backoff=30.0,
+                 statuses=RETRY_STATUSES, methods=IDEMPOTENT_METHODS):
+        """Initialization"""
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(method.upper() for method in methods)
+
+    def __repr__(self):
+        return "RetryPolicy(max_attempts=%d, backoff=%s)" % (self.max_attempts,
+                                                             self.backoff)
+
+    def get_delay(self, method, attempt, error, transient):
+        """Get the delay before sending a failed request again
+
+        :param str method: HTTP method
+        :param int attempt: Number of the failed attempt, from 0
+        :param Exception error: Error raised by the attempt
+        :param bool transient: Error is a connection error or timeout
+        :return: Delay in seconds as :class:`float`, or :obj:`None` if the
+                 request must not be retried
+        """
+        if attempt + 1 >= self.max_attempts or method.upper() not in self.methods:
+            return None
+        if isinstance(error, PDNSError):
+            if error.status_code not in self.statuses:
+                return None
+            retry_after = getattr(error, "retry_after", None)
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+        elif not transient:
+            return None
+        return random.uniform(0, min(self.max_backoff,
+                                     self.backoff * 2 ** attempt))
+
+
+class CircuitBreaker(object):
+    """Circuit breaker of an API endpoint
+
+    After *failure_threshold* consecutive failures (connection errors,
+    timeouts or 5xx responses) the circuit opens: requests fail at once
+    with :class:`~powerdns.exceptions.PDNSCircuitOpenError` instead of
+    waiting for timeouts. After *reset_timeout* seconds a single trial
+    request is let through, its success closes the circuit again.
+
+    :param int failure_threshold: Consecutive failures opening the circuit
+    :param float reset_timeout: Seconds before a trial request
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """Initialization"""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    def __repr__(self):
+        return "CircuitBreaker(%s, failures=%d)" % (self.state, self._failures)
+
+    @property
+    def state(self):
+        """Current state, :attr:`CLOSED`, :attr:`OPEN` or :attr:`HALF_OPEN`"""
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow(self):
+        """Tell whether a request may be sent now
+
+        In half-open state, only the first caller is allowed to send its
+        request until its outcome is recorded.
+
+        :return: Seconds before the next trial as :class:`float`, or
+                 :obj:`None` if the request may be sent
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return None
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if remaining > 0:
+                return remaining
+            if self._trial:
+                return 0.0
+            self._trial = True
+            return None
+
+    def record_success(self):
+        """Close the circuit"""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        """Count a failure, open the circuit past the threshold"""
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._trial = False
+
+    def reset(self):
+        """Close the circuit and forget failures"""
+        self.record_success()
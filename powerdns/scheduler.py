@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+powerdns.scheduler - Client-side rate limiting and request scheduling
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from fnmatch import fnmatchcase
+
+#: Priority of changes a user is waiting for
+PRIORITY_INTERACTIVE = 0
+#: Default priority
+PRIORITY_NORMAL = 5
+#: Priority of bulk jobs and reconciliation
+PRIORITY_BACKGROUND = 10
+
+_priority = ContextVar("powerdns_priority", default=PRIORITY_NORMAL)
+
+
+@contextmanager
+def request_priority(priority):
+    """Set the priority of requests sent in a block
+
+    It follows threads submitted by :func:`powerdns.fanout.fan_out` and
+    asyncio tasks created in the block::
+
+        with request_priority(PRIORITY_BACKGROUND):
+            endpoint.refresh_zones()
+
+    :param int priority: Priority, lower values are sent first
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority():
+    """Get the priority of requests sent from the current context"""
+    return _priority.get()
+
+
+class TokenBucket(object):
+    """Token bucket
+
+    :param float rate: Tokens added per second
+    :param int burst: Bucket capacity, defaults to one second of tokens
+    """
+    def __init__(self, rate, burst=None):
+        """Initialization"""
+        self.rate = float(rate)
+        self.burst = float(burst or max(1.0, self.rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self):
+        """Get seconds before a token is available"""
+        self._refill()
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def consume(self):
+        """Take a token"""
+        self._refill()
+        self._tokens -= 1
+
+
+class LimitRule(object):
+    """Token bucket applied to matching requests
+
+    :param TokenBucket bucket: Token bucket
+    :param str method: HTTP method, any if :obj:`None`
+    :param str path: Path prefix, or pattern if it holds ``*``, any if
+                     :obj:`None`
+    """
+    __slots__ = ("bucket", "method", "path")
+
+    def __init__(self, bucket, method=None, path=None):
+        """Initialization"""
+        self.bucket = bucket
+        self.method = method.upper() if method else None
+        self.path = path
+
+    def __repr__(self):
+        return "LimitRule(%s %s, %s/s)" % (self.method or "*", self.path or "*",
+                                           self.bucket.rate)
+
+    def matches(self, method, path):
+        if self.method is not None and self.method != method:
+            return False
+        if self.path is None:
+            return True
+        if "*" in self.path:
+            return fnmatchcase(path, self.path)
+        return path.startswith(self.path)
+
+
+class RateLimiter(object):
+    """Set of token buckets limiting requests by method and path
+
+    A request has to get a token from every matching rule::
+
+        limiter = RateLimiter(rate=50)
+        limiter.add_limit(5, method="PATCH", path="*/zones/*")
+
+    :param float rate: Global rate in requests per second, optional
+    :param int burst: Global burst size
+    """
+    def __init__(self, rate=None, burst=None):
+        """Initialization"""
+        self.rules = []
+        if rate:
+            self.add_limit(rate, burst)
+
+    def add_limit(self, rate, burst=None, method=None, path=None):
+        """Add a limit
+
+        :param float rate: Requests per second
+        :param int burst: Burst size, defaults to one second of requests
+        :param str method: HTTP method, any if :obj:`None`
+        :param str path: Path prefix (``/servers/localhost/zones``) or
+                         pattern (``*/zones/*``), any if :obj:`None`
+        :return: :class:`LimitRule`
+        """
+        rule = LimitRule(TokenBucket(rate, burst), method, path)
+        self.rules.append(rule)
+        return rule
+
+    def delay(self, method, path):
+        """Get seconds before a request may be sent"""
+        return max([rule.bucket.delay() for rule in self.rules
+                    if rule.matches(method, path)] or [0.0])
+
+    def consume(self, method, path):
+        """Account for a sent request"""
+        for rule in self.rules:
+            if rule.matches(method, path):
+                rule.bucket.consume()
+
+
+class RequestScheduler(object):
+    """Priority queue in front of the API
+
+    Waiting requests are sent by priority, then in arrival order, as soon
+    as the rate limiter and the concurrency limit allow it. Interactive
+    requests thus jump ahead of queued background ones.
+
+    :param RateLimiter rate_limiter: Rate limiter, optional
+    :param int max_concurrency: Maximum number of in-flight requests, no
+                                limit if :obj:`None`
+
+    A scheduler serves either a synchronous or an asynchronous client.
+    """
+    def __init__(self, rate_limiter=None, max_concurrency=None):
+        """Initialization"""
+        self.rate_limiter = rate_limiter
+        self.max_concurrency = max_concurrency
+        self._queue = []
+        self._counter = itertools.count()
+        self._active = 0
+        self._condition = threading.Condition()
+        self._async_condition = None
+        self._stats = {
+            "requests": 0,
+            "delayed": 0,
+            "wait_time": 0.0,
+            "max_wait_time": 0.0,
+        }
+
+    @property
+    def queue_depth(self):
+        """Number of requests waiting"""
+        return len(self._queue)
+
+    @property
+    def active(self):
+        """Number of requests in flight"""
+        return self._active
+
+    def stats(self):
+        """Get scheduling statistics
+
+        :return: Queue depth, in-flight requests, number of requests and of
+                 delayed ones, total, mean and maximum wait time in seconds
+                 as :class:`dict`
+        """
+        stats = dict(self._stats, queue_depth=self.queue_depth,
+                     active=self._active)
+        stats["mean_wait_time"] = stats["wait_time"] / (stats["requests"] or 1)
+        return stats
+
+    def _admit(self, ticket, method, path):
+        """Admit the request if its turn came
+
+        :return: 0 if admitted, else seconds to wait or :obj:`None` to wait
+                 for a notification
+        """
+        if self._queue[0] is not ticket:
+            return None
+        if self.max_concurrency and self._active >= self.max_concurrency:
+            return None
+        if self.rate_limiter is not None:
+            delay = self.rate_limiter.delay(method, path)
+            if delay > 0:
+                return delay
+            self.rate_limiter.consume(method, path)
+        heapq.heappop(self._queue)
+        self._active += 1
+        return 0
+
+    def _withdraw(self, ticket):
+        if ticket in self._queue:
+            self._queue.remove(ticket)
+            heapq.heapify(self._queue)
+
+    def _account(self, started):
+        waited = time.monotonic() - started
+        self._stats["requests"] += 1
+        self._stats["wait_time"] += waited
+        if waited > 0.001:
+            self._stats["delayed"] += 1
+        self._stats["max_wait_time"] = max(self._stats["max_wait_time"], waited)
+
+    def acquire(self, method, path, priority=None):
+        """Wait for the turn of a request
+
+        :param str method: HTTP method
+        :param str path: Request path
+        :param int priority: Priority, defaults to :func:`current_priority`
+        """
+        started = time.monotonic()
+        if priority is None:
+            priority = current_priority()
+        ticket = [priority, next(self._counter)]
+        with self._condition:
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    wait = self._admit(ticket, method, path)
+                    if wait == 0:
+                        break
+                    self._condition.wait(wait)
+            except BaseException:
+                self._withdraw(ticket)
+                raise
+            finally:
+                self._condition.notify_all()
+            self._account(started)
+
+    def release(self):
+        """Signal the end of a request"""
+        with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    def _get_async_condition(self):
+        if self._async_condition is None:
+            self._async_condition = asyncio.Condition()
+        return self._async_condition
+
+    async def acquire_async(self, method, path, priority=None):
+        """Wait for the turn of a request, see :meth:`acquire`"""
+        started = time.monotonic()
+        if priority is None:
+            priority = current_priority()
+        ticket = [priority, next(self._counter)]
+        condition = self._get_async_condition()
+        async with condition:
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    wait = self._admit(ticket, method, path)
+                    if wait == 0:
+                        break
+                    try:
+                        await asyncio.wait_for(condition.wait(), wait)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                self._withdraw(ticket)
+                raise
+            finally:
+                condition.notify_all()
+            self._account(started)
+
+    async def release_async(self):
+        """Signal the end of a request"""
+        condition = self._get_async_condition()
+        async with condition:
+            self._active -= 1
+            condition.notify_all()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+powerdns.singleflight - Coalescing of concurrent identical requests
+"""
+
+import asyncio
+import threading
+
+
+class _Call(object):
+    """In-flight call shared by concurrent callers"""
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """Run a single call at a time per key, sharing its outcome
+
+    Callers arriving while a call with the same key is in flight wait for
+    it and get the same value, or the same exception, instead of running
+    their own. Values are shared, so they should be immutable: the API
+    clients share raw response bodies and decode them for each caller.
+
+    One instance serves either threads or asyncio tasks.
+    """
+    def __init__(self):
+        """Initialization"""
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._futures = {}
+        #: Calls actually run and calls served by another one
+        self.stats = {
+            "calls": 0,
+            "coalesced": 0,
+        }
+
+    def __len__(self):
+        return len(self._calls) + len(self._futures)
+
+    def do(self, key, func):
+        """Run a function unless a call with the same key is in flight
+
+        :param key: Hashable call key
+        :param callable func: Function to run, without arguments
+        :return: Value and whether it came from another caller as
+                 :class:`tuple`
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats["calls"] += 1
+            else:
+                self.stats["coalesced"] += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+        try:
+            call.value = func()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.value, False
+
+    async def do_async(self, key, func):
+        """Await a coroutine function unless a call with the same key is in
+        flight, see :meth:`do`
+
+        A waiting caller being cancelled does not cancel the shared call.
+        """
+        future = self._futures.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(future), True
+        future = self._futures[key] = asyncio.get_running_loop().create_future()
+        self.stats["calls"] += 1
+        try:
+            value = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            future.exception()  # retrieved, even if nobody waits
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            del self._futures[key]
+        return value, False
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+powerdns.snapshot - Persistent on-disk zone snapshots
+"""
+
+import json
+import sqlite3
+import threading
+from collections import namedtuple
+
+from powerdns.interface import LOG
+
+#: Record returned by :meth:`SnapshotStore.query`
+SnapshotRecord = namedtuple("SnapshotRecord", ["server", "zone", "name",
+                                               "type", "ttl", "content",
+                                               "disabled"])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS zones (
+    server TEXT NOT NULL,
+    name TEXT NOT NULL,
+    serial INTEGER,
+    details TEXT NOT NULL,
+    PRIMARY KEY (server, name)
+);
+CREATE TABLE IF NOT EXISTS records (
+    server TEXT NOT NULL,
+    zone TEXT NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    ttl INTEGER,
+    content TEXT,
+    disabled INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS records_zone ON records (server, zone);
+CREATE INDEX IF NOT EXISTS records_name ON records (name, type);
+CREATE INDEX IF NOT EXISTS records_type ON records (type);
+CREATE INDEX IF NOT EXISTS records_content ON records (content);
+"""
+
+
+class SnapshotStore(object):
+    """SQLite store of zone details and rrsets keyed by zone name and serial
+
+    A process can start from the snapshot without any API request, then
+    revalidate it with the zone list::
+
+        store = SnapshotStore("/var/cache/powerdns.sqlite")
+        server = PDNSEndpoint(api_client).get_server("localhost")
+        server.load_snapshot(store)
+        server.revalidate()
+
+    Zones refreshed afterwards are written back to the store. Records can
+    also be searched locally with :meth:`query`, without touching the API.
+
+    :param str path: Database file path, ``:memory:`` for a temporary store
+    """
+    def __init__(self, path):
+        """Initialization"""
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the database"""
+        self._conn.close()
+
+    def save_zone(self, server_id, details, rrsets):
+        """Store a zone, replacing any previous snapshot of it
+
+        :param str server_id: Server id
+        :param dict details: Zone details without rrsets
+        :param iterable rrsets: Rrsets as :meth:`RRSet.to_tuple` tuples
+        """
+        name = details["name"]
+        serial = details.get("serial")
+        rows = []
+        for rr_name, rtype, ttl, records in rrsets:
+            if not records:
+                rows.append((server_id, name, rr_name, rtype, ttl, None, 0))
+            for content, disabled in records or ():
+                rows.append((server_id, name, rr_name, rtype, ttl, content,
+                             int(disabled)))
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM records WHERE server = ? AND zone = ?",
+                               (server_id, name))
+            self._conn.execute("INSERT OR REPLACE INTO zones VALUES (?, ?, ?, ?)",
+                               (server_id, name,
+                                serial if isinstance(serial, int) else None,
+                                json.dumps(details, default=str)))
+            self._conn.executemany("INSERT INTO records VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                   rows)
+        LOG.debug("zone %s stored in snapshot %s", name, self.path)
+
+    def delete_zone(self, server_id, name):
+        """Drop a zone snapshot
+
+        :param str server_id: Server id
+        :param str name: Zone name
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM records WHERE server = ? AND zone = ?",
+                               (server_id, name))
+            self._conn.execute("DELETE FROM zones WHERE server = ? AND name = ?",
+                               (server_id, name))
+
+    def zones(self, server_id):
+        """List stored zones of a server
+
+        :param str server_id: Server id
+        :return: ``{name: serial}`` as :class:`dict`
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT name, serial FROM zones WHERE server = ?",
+                                      (server_id,)).fetchall()
+        return dict(rows)
+
+    def load_zone(self, server_id, name):
+        """Load a zone snapshot
+
+        :param str server_id: Server id
+        :param str name: Zone name
+        :return: Zone details as :class:`dict` and rrsets as a tuple of
+                 :meth:`RRSet.to_tuple` tuples, or :obj:`None`
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT details FROM zones WHERE server = ? AND name = ?",
+                                     (server_id, name)).fetchone()
+            if row is None:
+                return None
+            cursor = self._conn.execute(
+                "SELECT name, type, ttl, content, disabled FROM records "
+                "WHERE server = ? AND zone = ? ORDER BY rowid", (server_id, name))
+            rrsets = {}
+            for rr_name, rtype, ttl, content, disabled in cursor:
+                key = (rr_name, rtype)
+                if key not in rrsets:
+                    rrsets[key] = (ttl, [])
+                if content is not None:
+                    rrsets[key][1].append((content, bool(disabled)))
+        return json.loads(row[0]), tuple((rr_name, rtype, ttl, tuple(records))
+                                         for (rr_name, rtype), (ttl, records)
+                                         in rrsets.items())
+
+    def query(self, name=None, rtype=None, content=None, zone=None,
+              server_id=None, limit=None):
+        """Search stored records without touching the API
+
+        Every criterion is optional and uses an index. *name* and *content*
+        accept ``*`` wildcards: patterns with a fixed prefix, such as
+        ``www.*``, still use the index, while a leading ``*`` scans every
+        record unless another criterion narrows the search.
+
+        :param str name: Record name
+        :param str rtype: Record type
+        :param str content: Record content
+        :param str zone: Zone name
+        :param str server_id: Server id
+        :param int limit: Maximum number of results
+        :return: Generator of :class:`SnapshotRecord`
+        """
+        clauses, params = [], []
+        for column, value in (("name", name), ("content", content)):
+            if value is None:
+                continue
+            if "*" in value:
+                clauses.append("%s GLOB ?" % column)
+            else:
+                clauses.append("%s = ?" % column)
+            params.append(value)
+        for column, value in (("type", rtype), ("zone", zone),
+                              ("server", server_id)):
+            if value is not None:
+                clauses.append("%s = ?" % column)
+                params.append(value)
+        sql = "SELECT server, zone, name, type, ttl, content, disabled FROM records"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if limit is not None:
+            sql += " LIMIT %d" % int(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        for row in rows:
+            yield SnapshotRecord(*row[:6], disabled=bool(row[6]))
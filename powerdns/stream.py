@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+powerdns.stream - Incremental parsing of large API responses
+"""
+
+import codecs
+import json
+
+_WHITESPACE = " \t\n\r"
+
+# Parser states
+_START, _KEY, _COLON, _VALUE, _NEXT_KEY, _ITEM, _NEXT_ITEM, _END = range(8)
+
+
+class JSONStreamParser(object):
+    """Push parser for a JSON object holding one huge array
+
+    Data is fed by chunks as it is received. Elements of the array stored
+    under *key* are decoded one at a time and returned as soon as they are
+    complete, so memory is bounded by one element plus one chunk, not by
+    the whole document. Other members of the object are decoded entirely.
+
+    :param str key: Name of the member holding the array to stream
+
+    Example::
+
+        parser = JSONStreamParser("rrsets")
+        for chunk in chunks:
+            for event, value in parser.feed(chunk):
+                ...
+        parser.close()
+
+    Events are ``("item", element)`` for each array element and
+    ``("field", (name, value))`` for other members.
+    """
+    def __init__(self, key):
+        """Initialization"""
+        self.key = key
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _START
+        self._current_key = None
+        self._eof = False
+
+    def feed(self, data):
+        """Feed a chunk of the document
+
+        :param data: Chunk as :class:`bytes` or :class:`str`
+        :return: Events completed by this chunk as list of :class:`tuple`
+        """
+        if isinstance(data, bytes):
+            data = self._utf8.decode(data)
+        self._buffer = self._buffer[self._pos:] + data
+        self._pos = 0
+        return self._parse()
+
+    def close(self):
+        """Signal the end of the document
+
+        :return: Remaining events as list of :class:`tuple`
+        :raise ValueError: If the document is incomplete or invalid
+        """
+        self._buffer = self._buffer[self._pos:] + self._utf8.decode(b"", final=True)
+        self._pos = 0
+        self._eof = True
+        events = self._parse()
+        if self._state != _END or self._buffer[self._pos:].strip(_WHITESPACE):
+            raise ValueError("Incomplete or invalid JSON document")
+        return events
+
+    def _skip(self):
+        """Skip whitespaces, return next char or None if more data needed"""
+        buffer, pos = self._buffer, self._pos
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return buffer[pos] if pos < len(buffer) else None
+
+    def _expect(self, chars):
+        char = self._skip()
+        if char is None:
+            return None
+        if char not in chars:
+            raise ValueError("Expecting one of %r at char %d, got %r"
+                             % (chars, self._pos, char))
+        self._pos += 1
+        return char
+
+    def _decode(self):
+        """Decode next value, return (found, value)"""
+        if self._skip() is None:
+            return False, None
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except ValueError:
+            if self._eof:
+                raise
+            return False, None
+        # A number ending the buffer may continue in the next chunk
+        if end == len(self._buffer) and not self._eof and \
+                isinstance(value, (int, float)) and not isinstance(value, bool):
+            return False, None
+        self._pos = end
+        return True, value
+
+    def _parse(self):
+        events = []
+        while True:
+            state = self._state
+            if state == _START:
+                if self._expect("{") is None:
+                    break
+                self._state = _KEY
+            elif state == _KEY:
+                char = self._skip()
+                if char is None:
+                    break
+                if char == "}":
+                    self._pos += 1
+                    self._state = _END
+                    continue
+                found, self._current_key = self._decode()
+                if not found:
+                    break
+                self._state = _COLON
+            elif state == _COLON:
+                if self._expect(":") is None:
+                    break
+                self._state = _VALUE
+            elif state == _VALUE:
+                char = self._skip()
+                if char is None:
+                    break
+                if self._current_key == self.key and char == "[":
+                    self._pos += 1
+                    self._state = _ITEM
+                    continue
+                found, value = self._decode()
+                if not found:
+                    break
+                events.append(("field", (self._current_key, value)))
+                self._state = _NEXT_KEY
+            elif state == _NEXT_KEY:
+                char = self._expect(",}")
+                if char is None:
+                    break
+                self._state = _KEY if char == "," else _END
+            elif state == _ITEM:
+                char = self._skip()
+                if char is None:
+                    break
+                if char == "]":
+                    self._pos += 1
+                    self._state = _NEXT_KEY
+                    continue
+                found, value = self._decode()
+                if not found:
+                    break
+                events.append(("item", value))
+                self._state = _NEXT_ITEM
+            elif state == _NEXT_ITEM:
+                char = self._expect(",]")
+                if char is None:
+                    break
+                self._state = _ITEM if char == "," else _NEXT_KEY
+            else:
+                break
+        return events
+
+
+def iter_json_stream(chunks, key):
+    """Parse a JSON object from an iterable of chunks
+
+    :param chunks: Iterable of :class:`bytes` or :class:`str` chunks
+    :param str key: Name of the member holding the array to stream
+    :return: Generator of events, see :class:`JSONStreamParser`
+    """
+    parser = JSONStreamParser(key)
+    for chunk in chunks:
+        for event in parser.feed(chunk):
+            yield event
+    for event in parser.close():
+        yield event
@@ -1,5 +1,27 @@
+import re
 from datetime import timedelta, datetime
 
+_DURATION_RE = re.compile(r"(\d+)([smhdw]?)", re.I)
+_DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def is_duration(value):
+    """:obj:`True` if *value* is a duration such as ``3600`` or ``1h30m``"""
+    return bool(value) and _DURATION_RE.sub("", value) == ""
+
+
+def parse_duration(value):
+    """Parse a duration in seconds, with optional BIND units
+
+    :param str value: Duration such as ``3600``, ``1h`` or ``1w2d``
+    :return: Seconds as :class:`int`
+    """
+    if not is_duration(value):
+        raise ValueError("invalid duration '%s'" % value)
+    return sum(int(amount) * _DURATION_UNITS[unit.lower()]
+               for amount, unit in _DURATION_RE.findall(value))
+
+
 class EMail:
 
     def __init__(self, email):
@@ -17,19 +39,20 @@ class EMail:
         # email = repr(email)
         new_mail_parts = ''
         mail_parts = email.split("@")
-        new_mail_parts += "\.".join(mail_parts[0].split("."))
+        new_mail_parts += r"\.".join(mail_parts[0].split("."))
         new_mail_parts += "."
-        new_mail_parts += mail_parts[1]
+        new_mail_parts += mail_parts[1].rstrip(".")
         new_mail_parts += "."
         return str(new_mail_parts)
 
     @classmethod
     def convert_to_email(cls, email):
-        email = repr(email)
-        dirty_mail_parts = email.split(r'\.')
-        mail_party = dirty_mail_parts[-1:]
-        last_item_before_at=mail_party[0].split(".")
-        return str(".".join(dirty_mail_parts[0:-1]+[last_item_before_at[0]])).replace("\.", ".")+"@"+".".join(bar[1:])
+        # The local part ends at the first dot not escaped by a backslash
+        match = re.match(r"^((?:[^.\\]|\\.)*)\.(.*)$", email)
+        if match is None:
+            raise ValueError("invalid SOA mailbox '%s'" % email)
+        local_part, domain = match.groups()
+        return local_part.replace("\\.", ".") + "@" + domain.rstrip(".")
 
     def get_email(self):
         return self._email
@@ -62,16 +85,21 @@ class SOARecord:
 
     @classmethod
     def parser(cls, soa_record):
-        part = soa_record.split(" ")
+        part = soa_record.split()
+        if len(part) != 7:
+            raise ValueError("invalid SOA record '%s'" % soa_record)
 
         return cls(mname=part[0],
                    rname=EMail.parse(part[1]),
-                   serial=Serial.parse(part[2]),
-                   refresh=timedelta(seconds=part[3]),
-                   expire=timedelta(seconds=part[4]),
-                   ttl=timedelta(seconds=part[5]))
+                   serial=Serial.parser(part[2]),
+                   refresh=timedelta(seconds=parse_duration(part[3])),
+                   retry=timedelta(seconds=parse_duration(part[4])),
+                   expire=timedelta(seconds=parse_duration(part[5])),
+                   ttl=timedelta(seconds=parse_duration(part[6])))
 
 class Serial:
+    """Zone serial, ``YYYYMMDDnn`` or a plain counter when *date* is
+    :obj:`None`"""
 
     def __init__(self, date, change_count):
         self.date = date
@@ -79,20 +107,28 @@ class Serial:
 
     @classmethod
     def parser(cls, serial):
-        date_part = serial[:-2]
-        change_count = serial[-2:]
-        return cls(datetime.strptime(date_part, "%Y%m%d"), change_count)
+        serial = str(serial)
+        if len(serial) == 10:
+            try:
+                return cls(datetime.strptime(serial[:-2], "%Y%m%d"), serial[-2:])
+            except ValueError:
+                pass
+        return cls(None, serial)
 
     def get_serial(self):
+        if self.date is None:
+            return str(self.change_count)
         return "{}{}".format(self.date.strftime("%Y%m%d"), str(self.change_count).rjust(2, "0"))
 
     def update(self):
-        if self.date.date() == datetime.date():
+        if self.date is None:
+            self.change_count = self.change_count+1
+        elif self.date.date() == datetime.now().date():
             self.change_count = self.change_count+1
         else:
-            self.date = datetime.now().date()
+            self.date = datetime.now()
             self.change_count = 1
 
     @classmethod
     def new(cls):
-        return cls(datetime.now(), 0)
\ No newline at end of file
+        return cls(datetime.now(), 0)
@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+powerdns.zonefile - Streaming BIND master file import and export
+"""
+
+import sys
+from collections import namedtuple
+
+from powerdns.exceptions import PDNSZoneFileError
+from powerdns.interface import LOG
+from powerdns.models.rrset import RRSet
+from powerdns.utils import SOARecord, is_duration, parse_duration
+
+#: Record classes accepted in master files
+CLASSES = ("IN", "CH", "HS", "CS")
+
+#: Positions of domain names in record data, made absolute on import
+NAME_FIELDS = {
+    "CNAME": (0,),
+    "DNAME": (0,),
+    "NS": (0,),
+    "PTR": (0,),
+    "MX": (1,),
+    "AFSDB": (1,),
+    "KX": (1,),
+    "RT": (1,),
+    "SRV": (3,),
+    "NAPTR": (5,),
+    "RP": (0, 1),
+    "MINFO": (0, 1),
+    "SOA": (0, 1),
+}
+
+#: Record of a master file, with its line number
+ZoneFileRecord = namedtuple("ZoneFileRecord", ("name", "rtype", "ttl", "content", "lineno"))
+
+
+def absolute_name(name, origin):
+    """Make a master file name absolute
+
+    :param str name: Name, ``@`` for the origin
+    :param str origin: Current origin, absolute
+    :return: Absolute name as :class:`str`
+    """
+    if name == "@":
+        return origin
+    if name.endswith(".") and not name.endswith("\\."):
+        return name
+    if origin == ".":
+        return name + "."
+    return "%s.%s" % (name, origin)
+
+
+def relative_name(name, origin):
+    """Make an absolute name relative to an origin, if below it
+
+    :param str name: Absolute name
+    :param str origin: Origin, absolute
+    :return: Relative name, ``@`` or *name* as :class:`str`
+    """
+    if name == origin:
+        return "@"
+    if name.endswith("." + origin):
+        return name[:-len(origin) - 1]
+    return name
+
+
+def _tokenize(line, state):
+    """Split a physical line into tokens
+
+    Quoted strings are kept as single tokens, quotes included, comments
+    are dropped and parentheses tracked in ``state["depth"]``.
+    """
+    tokens = []
+    token = []
+    quoted = escaped = False
+    for char in line:
+        if escaped:
+            token.append(char)
+            escaped = False
+        elif char == "\\":
+            token.append(char)
+            escaped = True
+        elif quoted:
+            token.append(char)
+            if char == '"':
+                quoted = False
+        elif char == '"':
+            token.append(char)
+            quoted = True
+        elif char == ";":
+            break
+        elif char in " \t\r\n()":
+            if token:
+                tokens.append("".join(token))
+                token = []
+            if char == "(":
+                state["depth"] += 1
+            elif char == ")":
+                state["depth"] -= 1
+        else:
+            token.append(char)
+    if quoted:
+        raise ValueError("unterminated quoted string")
+    if token:
+        tokens.append("".join(token))
+    return tokens
+
+
+def _logical_lines(lines, filename=None):
+    """Join lines continued by parentheses
+
+    :return: Generator of ``(lineno, owner_given, tokens)``
+    """
+    state = {"depth": 0}
+    tokens = []
+    start = owner_given = None
+    for lineno, line in enumerate(lines, 1):
+        if state["depth"] == 0:
+            start = lineno
+            owner_given = bool(line) and line[0] not in " \t"
+        try:
+            tokens.extend(_tokenize(line, state))
+        except ValueError as error:
+            raise PDNSZoneFileError(str(error), filename, lineno, line)
+        if state["depth"] < 0:
+            raise PDNSZoneFileError("unbalanced parenthesis", filename, lineno, line)
+        if state["depth"] == 0 and tokens:
+            yield start, owner_given, tokens
+            tokens = []
+    if state["depth"]:
+        raise PDNSZoneFileError("unterminated parenthesis", filename, start)
+
+
+def _rdata(rtype, fields, origin):
+    """Build record content from its fields, like PowerDNS expects it"""
+    for index in NAME_FIELDS.get(rtype, ()):
+        if index < len(fields) and fields[index] != ".":
+            fields[index] = absolute_name(fields[index], origin)
+    if rtype == "SOA":
+        return SOARecord.parser(" ".join(fields)).get_content()
+    if rtype in ("TXT", "SPF"):
+        fields = [field if field.startswith('"') else '"%s"' % field
+                  for field in fields]
+    return " ".join(fields)
+
+
+def iter_zone_file(lines, origin, default_ttl=3600, filename=None):
+    """Parse a BIND master file, one record at a time
+
+    ``$ORIGIN`` and ``$TTL`` directives, ``@``, relative and omitted owner
+    names, omitted TTL and class, duration units, parentheses over
+    multiple lines, comments and quoted strings are supported. Domain
+    names in record data are made absolute. Lines are read lazily, memory
+    is bounded by one record.
+
+    :param iterable lines: Lines, such as a file object
+    :param str origin: Initial origin, usually the zone name
+    :param int default_ttl: TTL of records without one, unless given by a
+                            ``$TTL`` directive or a previous record
+    :param str filename: File name for error messages
+    :return: Generator of :class:`ZoneFileRecord`
+    :raise PDNSZoneFileError: On invalid content
+    """
+    origin = absolute_name(origin, ".")
+    # $TTL applies to records without TTL, else the previous record one
+    ttl = None
+    last_ttl = default_ttl
+    owner = None
+    for lineno, owner_given, tokens in _logical_lines(lines, filename):
+        try:
+            if tokens[0].startswith("$"):
+                directive = tokens[0].upper()
+                if directive == "$ORIGIN" and len(tokens) == 2:
+                    origin = absolute_name(tokens[1], origin)
+                elif directive == "$TTL" and len(tokens) == 2:
+                    ttl = parse_duration(tokens[1])
+                else:
+                    raise ValueError("unsupported directive %s" % tokens[0])
+                continue
+            if owner_given:
+                owner = sys.intern(absolute_name(tokens.pop(0), origin))
+            elif owner is None:
+                raise ValueError("no previous owner name")
+            record_ttl = None
+            for _ in range(2):
+                if tokens and record_ttl is None and is_duration(tokens[0]):
+                    record_ttl = parse_duration(tokens.pop(0))
+                elif tokens and tokens[0].upper() in CLASSES:
+                    tokens.pop(0)
+            if not tokens:
+                raise ValueError("missing record type")
+            rtype = sys.intern(tokens.pop(0).upper())
+            if record_ttl is None:
+                record_ttl = last_ttl if ttl is None else ttl
+            else:
+                last_ttl = record_ttl
+            content = _rdata(rtype, tokens, origin)
+        except ValueError as error:
+            raise PDNSZoneFileError(str(error), filename=filename, lineno=lineno)
+        yield ZoneFileRecord(owner, rtype, record_ttl, content, lineno)
+
+
+def iter_zone_file_rrsets(lines, origin, default_ttl=3600, filename=None):
+    """Parse a BIND master file into rrsets
+
+    Consecutive records of the same name and type form an rrset, with the
+    lowest of their TTLs. See :func:`iter_zone_file`.
+
+    :return: Generator of :class:`~powerdns.models.rrset.RRSet`
+    """
+    rrset = None
+    for record in iter_zone_file(lines, origin, default_ttl, filename):
+        if rrset is not None and rrset._name == record.name and \
+                rrset._rtype == record.rtype:
+            rrset._records += ((record.content, False),)
+            if record.ttl != rrset._ttl:
+                LOG.debug("inconsistent TTL of %s %s line %d", record.name,
+                          record.rtype, record.lineno)
+                rrset._ttl = min(rrset._ttl, record.ttl)
+            continue
+        if rrset is not None:
+            yield rrset
+        rrset = RRSet.from_tuple(None, (record.name, record.rtype, record.ttl,
+                                        ((record.content, False),)))
+    if rrset is not None:
+        yield rrset
+
+
+def import_zone_file(zone, source, origin=None, default_ttl=3600,
+                     batch_size=1000):
+    """Send the rrsets of a BIND master file to a zone
+
+    Rrsets are sent as REPLACE changes through
+    :meth:`~powerdns.models.zone.PDNSZone.apply_changes`, *batch_size*
+    rrsets at a time, while the file is read, so memory is bounded by one
+    batch and the names and types of sent rrsets. Records of an rrset must
+    be within the same batch, which is the case of files grouping them;
+    records found after their rrset was sent fail the import, increase
+    *batch_size* for such files. Rrsets of the zone missing from the file
+    are kept.
+
+    The zone rrsets do not need to be loaded. If they are, sent rrsets are
+    added to them, so memory is only bounded for a zone not loaded.
+
+    :param PDNSZone zone: Zone, with a synchronous API client
+    :param source: File name or iterable of lines
+    :param str origin: Initial origin, zone name by default
+    :param int default_ttl: TTL of records without one before ``$TTL``
+    :param int batch_size: Number of rrsets buffered before being sent
+    :return: Number of rrsets sent
+    :raise PDNSZoneFileError: On invalid content, or records of an rrset
+                              already sent; previous batches are applied
+    """
+    if zone.is_async():
+        raise RuntimeError("Zone file import requires a synchronous API client")
+    filename = source if isinstance(source, str) else getattr(source, "name", None)
+    lines = open(source, encoding="utf-8") if isinstance(source, str) else source
+    pending = {}
+    # Names and types only, to refuse records of an rrset already sent
+    sent = set()
+    count = 0
+    try:
+        for rrset in iter_zone_file_rrsets(lines, origin or zone.get("name"),
+                                           default_ttl, filename):
+            key = (rrset._name, rrset._rtype)
+            if key in sent:
+                raise PDNSZoneFileError("records of %s %s after this rrset was sent, "
+                                        "group them or increase batch_size" % key,
+                                        filename=filename)
+            previous = pending.get(key)
+            if previous is not None:
+                previous._records += rrset._records
+                previous._ttl = min(previous._ttl, rrset._ttl)
+                continue
+            pending[key] = rrset
+            if len(pending) >= batch_size:
+                zone.apply_changes(list(pending.values()))
+                count += len(pending)
+                sent.update(pending)
+                pending = {}
+        if pending:
+            zone.apply_changes(list(pending.values()))
+            count += len(pending)
+    finally:
+        if lines is not source:
+            lines.close()
+    LOG.info("%d rrsets imported into zone %s", count, zone.get("name"))
+    return count
+
+
+def write_zone_file(rrsets, output, origin):
+    """Write rrsets as a BIND master file, one rrset at a time
+
+    Names are written relative to *origin*. PowerDNS disabled records have
+    no master file equivalent, they are written commented out.
+
+    :param iterable rrsets: Rrsets as :class:`~powerdns.models.rrset.RRSet`
+    :param output: Writable text file
+    :param str origin: Zone name
+    :return: Number of records written
+    """
+    output.write("$ORIGIN %s\n" % origin)
+    count = 0
+    for rrset in rrsets:
+        name = relative_name(rrset.get("name"), origin)
+        ttl = rrset.get("ttl")
+        rtype = rrset.get("rtype")
+        for content, disabled in rrset.get_record_tuples():
+            output.write("%s%s\t%d\tIN\t%s\t%s\n" % ("; " if disabled else "", name,
+                                                       ttl, rtype, content))
+            count += 1
+    return count
+
+
+def export_zone_file(zone, destination, stream=None):
+    """Write the rrsets of a zone as a BIND master file
+
+    Unless the zone rrsets are loaded, they are streamed from the API and
+    written as they are received, see
+    :meth:`~powerdns.models.zone.PDNSZone.iter_rrsets`. The SOA record is
+    written first if the zone is loaded, in API order otherwise.
+
+    :param PDNSZone zone: Zone, with a synchronous API client
+    :param destination: File name or writable text file
+    :param bool stream: Stream rrsets, by default if not loaded
+    :return: Number of records written
+    """
+    if stream is None:
+        stream = not zone._loaded
+    if stream:
+        rrsets = zone.iter_rrsets()
+    else:
+        rrsets = sorted(zone.get("rrsets"), key=lambda rrset: rrset.get("rtype") != "SOA")
+    output = open(destination, "w", encoding="utf-8") \
+        if isinstance(destination, str) else destination
+    try:
+        count = write_zone_file(rrsets, output, zone.get("name"))
+    finally:
+        if output is not destination:
+            output.close()
+    LOG.info("%d records of zone %s exported", count, zone.get("name"))
+    return count
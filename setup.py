@@ -54,5 +54,9 @@ if __name__ == '__main__':
             'Environment :: Web Environment',
             'Topic :: Utilities',
             ],
-        requires=['urllib3', 'requests']
+        requires=['urllib3', 'requests'],
+        extras_require={
+            'async': ['aiohttp'],
+            'orjson': ['orjson'],
+        },
     )
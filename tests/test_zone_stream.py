@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+#
+#  PowerDNS web api python client and interface (python-powerdns)
+#
+#  This file is part of python-powerdns
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the MIT License.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  MIT License for more details.
+#
+#  You should have received a copy of the MIT License along with this
+#  program; if not, see <https://opensource.org/licenses/MIT>.
+
+"""
+Streamed zone refresh
+"""
+
+import json
+import unittest
+
+from powerdns.client import PDNSApiClient
+from powerdns.models.rrset import RRSet
+from powerdns.models.server import PDNSServer
+from powerdns.models.zone import PDNSZone
+
+
+def make_rrsets(count, ttl=300):
+    return [{"name": "host%d.example.com." % index, "type": "A", "ttl": ttl,
+             "records": [{"content": "192.0.2.%d" % index, "disabled": False}]}
+            for index in range(count)]
+
+
+class StreamClient(PDNSApiClient):
+    """API client streaming a zone body, failing after *fail_after* bytes"""
+
+    def __init__(self, body, fail_after=None, chunk_size=64):
+        super(StreamClient, self).__init__("http://pdns.invalid/api/v1", "changeme")
+        self.body = body
+        self.fail_after = fail_after
+        self.chunk_size = chunk_size
+
+    def request_stream(self, path, method="GET", data=None, chunk_size=65536):
+        for start in range(0, len(self.body), self.chunk_size):
+            if self.fail_after is not None and start >= self.fail_after:
+                raise ConnectionError("stream interrupted")
+            yield self.body[start:start + self.chunk_size]
+
+
+class TestStreamedRefresh(unittest.TestCase):
+
+    def make_zone(self, client):
+        server = PDNSServer(client)
+        return PDNSZone(server, id="example.com.", name="example.com.",
+                        rrsets=make_rrsets(12))
+
+    def body(self, ttl):
+        return json.dumps({"id": "example.com.", "name": "example.com.",
+                           "rrsets": make_rrsets(12, ttl)}).encode()
+
+    def test_refresh(self):
+        zone = self.make_zone(StreamClient(self.body(60)))
+        zone.refresh(stream=True)
+        self.assertEqual(len(zone.get("rrsets")), 12)
+        self.assertEqual(zone.get_rrset("host11.example.com.", "A").get("ttl"), 60)
+
+    def test_interrupted_refresh_keeps_rrsets(self):
+        body = self.body(60)
+        zone = self.make_zone(StreamClient(body, fail_after=len(body) // 3))
+        zone.set("kind", "Master")
+        zone.append_rrset(RRSet(name="new.example.com.", rtype="A",
+                                records=["192.0.2.200"], ttl=60))
+        with self.assertRaises(ConnectionError):
+            zone.refresh(stream=True)
+        self.assertEqual(len(zone.get("rrsets")), 13)
+        for index in range(12):
+            rrset = zone.get_rrset("host%d.example.com." % index, "A")
+            self.assertEqual(rrset.get("ttl"), 300)
+        self.assertEqual(zone.get("kind"), "Master")
+        self.assertEqual(len(zone.dirty_rrsets), 1)
+
+        plan = zone.full_rrset_update([])
+        self.assertEqual(len(plan.deletes), 13)
+
+
+if __name__ == "__main__":
+    unittest.main()